@@ -0,0 +1,6 @@
+"""UserPromptSubmit hook scripts installed by 'cck hook install'.
+
+Each mode's script is copied verbatim into .claude/hooks as _cck_hook.py
+and precompiled; loader.py becomes user-prompt-submit.py and imports it.
+They are package data and are never imported by cck itself.
+"""
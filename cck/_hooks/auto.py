@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""CCK User Prompt Submit Hook - Injects project context every turn.
+
+Generated by: cck hook install
+Docs: https://github.com/takawasi/claude-context-keeper
+"""
+import os
+import sys
+
+MARKERS = frozenset(('.git', 'package.json', 'pyproject.toml', 'Cargo.toml', 'go.mod'))
+
+def find_project_root() -> str:
+    """Find project root by looking for common markers."""
+    cwd = d = os.getcwd()
+    while True:
+        # One readdir per level instead of a stat per marker
+        try:
+            if not MARKERS.isdisjoint(os.listdir(d)):
+                return d
+        except OSError:
+            pass
+        parent = os.path.dirname(d)
+        if parent == d:
+            return cwd
+        d = parent
+
+def generate_context(root: str) -> str:
+    """Generate brief project context."""
+    lines = []
+
+    # Detect project type
+    ptype = "unknown"
+    langs = []
+    # One readdir instead of a stat per candidate file
+    try:
+        entries = set(os.listdir(root))
+    except OSError:
+        entries = set()
+
+    if 'package.json' in entries:
+        ptype = "node"
+        langs.append("JavaScript/TypeScript")
+    elif 'pyproject.toml' in entries or 'setup.py' in entries:
+        ptype = "python"
+        langs.append("Python")
+    elif 'Cargo.toml' in entries:
+        ptype = "rust"
+        langs.append("Rust")
+    elif 'go.mod' in entries:
+        ptype = "go"
+        langs.append("Go")
+
+    lines.append(f"[CCK] {os.path.basename(root)} ({ptype})")
+    if langs:
+        lines.append(f"Languages: {', '.join(langs)}")
+
+    return '\n'.join(lines)
+
+def main():
+    try:
+        root = find_project_root()
+        context = generate_context(root)
+        sys.stdout.write(context)
+    except Exception:
+        pass  # Fail silently to not break Claude Code
+
+if __name__ == "__main__":
+    main()
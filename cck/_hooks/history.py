@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""CCK User Prompt Submit Hook - Reads history from SQLite database.
+
+Generated by: cck hook install --use-history
+Docs: https://github.com/takawasi/claude-context-keeper
+
+This hook asks the running watcher for recent history over
+.claude/cck.sock, falling back to reading .claude/cck_history.sqlite,
+and outputs recent operations for context injection each turn.
+
+Requires: cck watch --with-history running in background
+"""
+import os
+import sys
+import time
+
+MARKERS = frozenset(('.git', 'package.json', 'pyproject.toml', 'Cargo.toml', 'go.mod'))
+
+def find_project_root() -> str:
+    """Find project root by looking for common markers."""
+    cwd = d = os.getcwd()
+    while True:
+        # One readdir per level instead of a stat per marker
+        try:
+            if not MARKERS.isdisjoint(os.listdir(d)):
+                return d
+        except OSError:
+            pass
+        parent = os.path.dirname(d)
+        if parent == d:
+            return cwd
+        d = parent
+
+def read_socket(root: str):
+    """Get the history text from a running watcher; None if there is none."""
+    sock_path = os.path.join(root, '.claude', 'cck.sock')
+    if not os.path.exists(sock_path):
+        return None
+
+    import socket
+
+    chunks = []
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(1)
+            s.connect(sock_path)
+            while True:
+                chunk = s.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None  # Stale socket: the watcher is gone
+    return b''.join(chunks).decode('utf-8') or None
+
+def get_history(root: str, limit: int = 20) -> str:
+    """Read history from SQLite database."""
+    db_path = os.path.join(root, '.claude', 'cck_history.sqlite')
+    name = os.path.basename(root)
+
+    if not os.path.exists(db_path):
+        return f"[CCK] {name} - No history DB (run: cck watch --with-history)"
+
+    try:
+        # Only imported once there is a DB to read
+        import sqlite3
+
+        # Read-only: never takes a write lock or creates a journal, and
+        # plain tuple rows skip sqlite3.Row's per-column name lookups
+        uri_path = db_path.replace('%', '%25').replace('?', '%3f').replace('#', '%23')
+        conn = sqlite3.connect(f'file:{uri_path}?mode=ro', uri=True)
+
+        # Get recent file changes
+        cursor = conn.execute(
+            'SELECT timestamp, event_type, file_path FROM file_changes'
+            ' ORDER BY timestamp DESC, id DESC LIMIT ?',
+            (limit,)
+        )
+        changes = cursor.fetchall()
+        conn.close()
+
+        if not changes:
+            return f"[CCK] {name} - No recent changes"
+
+        lines = [f"[CCK] {name} - Recent changes:"]
+        event_map = {'created': '+', 'modified': '~', 'deleted': '-'}
+        for timestamp, event_type, file_path in changes:
+            if isinstance(timestamp, str):
+                ts = timestamp[11:19]  # ISO string, from before cck moved to epoch microseconds
+            else:
+                ts = time.strftime('%H:%M:%S', time.localtime(timestamp / 1e6))
+            symbol = event_map.get(event_type, '?')
+            lines.append(f"  {ts} {symbol} {file_path}")
+
+        return '\n'.join(lines)
+
+    except Exception as e:
+        return f"[CCK] {name} - History error: {e}"
+
+def main():
+    try:
+        root = find_project_root()
+        history = read_socket(root) or get_history(root)
+        sys.stdout.write(history)
+    except Exception:
+        pass  # Fail silently to not break Claude Code
+
+if __name__ == "__main__":
+    main()
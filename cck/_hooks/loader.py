@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""CCK User Prompt Submit Hook - Loader.
+
+Generated by: cck hook install
+Docs: https://github.com/takawasi/claude-context-keeper
+
+Runs the hook installed next to this file as _cck_hook.py. Imported
+modules load from their cached .pyc; a script run directly is
+recompiled on every turn.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _cck_hook import main
+
+main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""CCK User Prompt Submit Hook - Reads reminder.md for per-turn context.
+
+Generated by: cck hook install --use-reminder
+Docs: https://github.com/takawasi/claude-context-keeper
+
+This hook reads .claude/reminder.md (or reminder.md) and outputs its content.
+Edit the reminder.md file to customize what context is injected each turn.
+"""
+import os
+import sys
+
+MARKERS = frozenset(('.git', 'package.json', 'pyproject.toml', 'Cargo.toml', 'go.mod'))
+
+def find_project_root() -> str:
+    """Find project root by looking for common markers."""
+    cwd = d = os.getcwd()
+    while True:
+        # One readdir per level instead of a stat per marker
+        try:
+            if not MARKERS.isdisjoint(os.listdir(d)):
+                return d
+        except OSError:
+            pass
+        parent = os.path.dirname(d)
+        if parent == d:
+            return cwd
+        d = parent
+
+def get_reminder(root: str) -> str:
+    """Read reminder.md content."""
+    # Check multiple locations
+    candidates = [
+        os.path.join(root, '.claude', 'reminder.md'),
+        os.path.join(root, 'reminder.md'),
+    ]
+
+    for path in candidates:
+        if os.path.exists(path):
+            with open(path) as f:
+                return f.read().strip()
+
+    # Fallback: basic project info
+    return f"[CCK] {os.path.basename(root)} - No reminder.md found"
+
+def main():
+    try:
+        root = find_project_root()
+        reminder = get_reminder(root)
+        sys.stdout.write(reminder)
+    except Exception:
+        pass  # Fail silently to not break Claude Code
+
+if __name__ == "__main__":
+    main()
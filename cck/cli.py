@@ -1,61 +1,150 @@
-"""CLI interface for Claude Context Keeper."""
+"""CLI interface for Claude Context Keeper.
 
+Only what every invocation needs is imported here; config (yaml),
+history (sqlite3), the watcher (watchdog) and the scanner are imported
+inside the commands that use them, so --help and the hook commands start fast.
+"""
+
+import os
+import shutil
 import click
 from pathlib import Path
-from rich.console import Console
-from rich.prompt import Prompt, Confirm
+from typing import List, Optional, Tuple
 
-from .scanner import scan_project
 from .generator import generate_claude_md, generate_brief_context, AUTO_START, AUTO_END
-from .config import (
-    load_config, save_config, find_config_path,
-    CONFIG_TEMPLATE_MINIMAL, CONFIG_TEMPLATE_CB_STYLE
-)
-from .history import (
-    init_db, get_combined_history, format_history_compact, format_history_detailed,
-    log_file_change, cleanup_old_entries
-)
 
-console = Console()
 
+class _LazyConsole:
+    """rich Console created on first use.
 
-def merge_with_existing(existing_content: str, new_auto_content: str) -> str:
-    """Merge new auto-generated content while preserving user content.
+    Importing rich.console is a sizeable share of startup; commands that
+    exit early (--help, --version, errors) never pay for it.
+    """
 
-    Preserves:
-    - Content before AUTO_START marker (user's header content)
-    - Content after AUTO_END marker (user's custom sections)
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._console = None
 
-    Replaces:
-    - Content between AUTO_START and AUTO_END markers
+    def __getattr__(self, name):
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console(**self._kwargs)
+        return getattr(self._console, name)
+
+
+console = _LazyConsole()
+# For dumping file content: no markup, highlighting or wrapping, so
+# [brackets] in CLAUDE.md/reminder.md are printed verbatim
+raw_console = _LazyConsole(markup=False, highlight=False, emoji=False, soft_wrap=True)
+
+_AUTO_START_LEN = len(AUTO_START)
+_AUTO_END_LEN = len(AUTO_END)
+
+
+def _project_path(path: str, resolve_symlinks: bool = False) -> Path:
+    """Absolutize a project path.
+
+    os.path.abspath is pure string work; resolve() also lstat()s every
+    component to follow symlinks, which most invocations don't need.
     """
-    if not existing_content:
-        return new_auto_content
+    if resolve_symlinks:
+        return Path(path).resolve()
+    return Path(os.path.abspath(path))
 
-    # Find existing markers
-    start_idx = existing_content.find(AUTO_START)
-    end_idx = existing_content.find(AUTO_END)
 
-    if start_idx == -1 or end_idx == -1:
-        # No markers found - this is first run or legacy file
-        # Append new content after existing
-        return existing_content.rstrip() + "\n\n---\n\n" + new_auto_content
+def _write_atomic(path: Path, data: bytes):
+    """Write data via a temp file and os.replace.
+
+    Readers (Claude Code, the watcher) never see a half-written file, and
+    an interrupted write leaves the previous version in place. A symlinked
+    path (e.g. CLAUDE.md -> AGENTS.md) updates the link's target, and an
+    existing file keeps its mode.
+    """
+    target = Path(os.path.realpath(path))
+    tmp_path = target.with_name(target.name + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        if target.exists():
+            shutil.copymode(target, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _read_snippet(path: Path, size: int = 200) -> Optional[str]:
+    """Read the start of a file for the history DB; None for binary files.
+
+    Reads raw bytes and decodes once, leniently, rather than going through
+    a text-mode decoder that fails on the first invalid byte.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(size)
+    except OSError:
+        return None
+    if b'\0' in data:
+        return None
+    return data.decode('utf-8', 'replace')
+
+
+def _split_existing(existing_content: str) -> Tuple[str, str]:
+    """Split an existing CLAUDE.md into the user content around the auto section.
+
+    Returns (user_before, user_after) with whitespace next to the markers
+    trimmed. A file without markers is kept whole above a '---' separator.
+    """
+    if not existing_content or existing_content.isspace():
+        return "", ""
 
-    # Extract user content
-    user_before = existing_content[:start_idx].rstrip()
-    user_after = existing_content[end_idx + len(AUTO_END):].lstrip()
+    # Find existing markers; the end marker only counts after the start one
+    start_idx = existing_content.find(AUTO_START)
+    end_idx = -1
+    if start_idx != -1:
+        end_idx = existing_content.find(AUTO_END, start_idx + _AUTO_START_LEN)
 
-    # Build merged content
-    parts = []
+    if end_idx == -1:
+        # No markers found - this is first run or legacy file
+        # Keep existing content, new content goes after a separator
+        return existing_content.rstrip() + "\n\n---", ""
+
+    # Find user content bounds, trimming whitespace next to the markers
+    # by index rather than slicing and then rstrip()/lstrip()-copying
+    before_end = start_idx
+    while before_end and existing_content[before_end - 1].isspace():
+        before_end -= 1
+    after_start = end_idx + _AUTO_END_LEN
+    content_len = len(existing_content)
+    while after_start < content_len and existing_content[after_start].isspace():
+        after_start += 1
+
+    return existing_content[:before_end], existing_content[after_start:]
+
+
+def _join_sections(user_before: str, new_auto_content: str, user_after: str) -> str:
+    """Join user content and the auto section, separated by blank lines."""
+    if user_before and user_after:
+        return f"{user_before}\n\n{new_auto_content}\n\n{user_after}"
     if user_before:
-        parts.append(user_before)
-        parts.append("")  # blank line
-    parts.append(new_auto_content)
+        return f"{user_before}\n\n{new_auto_content}"
     if user_after:
-        parts.append("")  # blank line
-        parts.append(user_after)
+        return f"{new_auto_content}\n\n{user_after}"
+    return new_auto_content
 
-    return "\n".join(parts)
+
+def merge_with_existing(existing_content: str, new_auto_content: str) -> str:
+    """Merge new auto-generated content while preserving user content.
+
+    Preserves:
+    - Content before AUTO_START marker (user's header content)
+    - Content after AUTO_END marker (user's custom sections)
+
+    Replaces:
+    - Content between AUTO_START and AUTO_END markers
+    """
+    user_before, user_after = _split_existing(existing_content)
+    return _join_sections(user_before, new_auto_content, user_after)
 
 
 @click.group()
@@ -84,6 +173,12 @@ def setup(minimal: bool, cb_style: bool, non_interactive: bool):
         cck setup --minimal      # Quick setup with reminder.md only
         cck setup --cb-style     # Full workflow with file watching + history
     """
+    from rich.prompt import Prompt, Confirm
+    from .config import (
+        save_config, find_config_path, render_cb_style_config,
+        CONFIG_TEMPLATE_MINIMAL, CONFIG_TEMPLATE_CB_STYLE
+    )
+
     project_path = Path.cwd()
 
     # Check for existing config
@@ -107,11 +202,10 @@ def setup(minimal: bool, cb_style: bool, non_interactive: bool):
         mode = "minimal (default)"
     else:
         # Interactive mode
-        console.print("\n[bold]CCK Setup[/bold]\n")
-        console.print("Choose a configuration style:\n")
-        console.print("  [1] Minimal - Just reminder.md, you write what to inject")
-        console.print("  [2] CB-style - File watching + operation history (recommended)")
-        console.print("")
+        console.print("\n[bold]CCK Setup[/bold]\n\n"
+                      "Choose a configuration style:\n\n"
+                      "  [1] Minimal - Just reminder.md, you write what to inject\n"
+                      "  [2] CB-style - File watching + operation history (recommended)\n")
 
         choice = Prompt.ask("Select", choices=["1", "2"], default="2")
 
@@ -119,7 +213,6 @@ def setup(minimal: bool, cb_style: bool, non_interactive: bool):
             config_content = CONFIG_TEMPLATE_MINIMAL
             mode = "minimal"
         else:
-            config_content = CONFIG_TEMPLATE_CB_STYLE
             mode = "CB-style"
 
             # Additional CB-style options
@@ -135,28 +228,23 @@ def setup(minimal: bool, cb_style: bool, non_interactive: bool):
             )
 
             # Update config with user choices
-            config_content = config_content.replace(
-                "    - .  # Monitor entire project",
-                "\n".join(f"    - {p.strip()}" for p in watch_paths.split(","))
-            )
-            config_content = config_content.replace(
-                "history_limit: 20",
-                f"history_limit: {history_limit}"
+            config_content = render_cb_style_config(
+                [p.strip() for p in watch_paths.split(",")], history_limit
             )
 
     # Save config
     config_path = save_config(project_path, config_content)
-    console.print(f"\n[bold green]Config created:[/] {config_path}")
-    console.print(f"[dim]Mode: {mode}[/dim]")
+    lines = [f"\n[bold green]Config created:[/] {config_path}", f"[dim]Mode: {mode}[/dim]"]
 
     # Next steps
-    console.print("\n[bold]Next steps:[/bold]")
+    lines.append("\n[bold]Next steps:[/bold]")
     if "CB-style" in mode:
-        console.print("  1. Start file watcher: [cyan]cck watch --with-history[/cyan]")
-        console.print("  2. Install hook: [cyan]cck hook install --use-history[/cyan]")
+        lines.append("  1. Start file watcher: [cyan]cck watch --with-history[/cyan]")
+        lines.append("  2. Install hook: [cyan]cck hook install --use-history[/cyan]")
     else:
-        console.print("  1. Edit reminder: [cyan]cck reminder init[/cyan]")
-        console.print("  2. Install hook: [cyan]cck hook install --use-reminder[/cyan]")
+        lines.append("  1. Edit reminder: [cyan]cck reminder init[/cyan]")
+        lines.append("  2. Install hook: [cyan]cck hook install --use-reminder[/cyan]")
+    console.print("\n".join(lines))
 
 
 @main.command()
@@ -164,7 +252,9 @@ def setup(minimal: bool, cb_style: bool, non_interactive: bool):
 @click.option('--output', '-o', type=click.Path(), default='CLAUDE.md',
               help='Output file path (default: CLAUDE.md)')
 @click.option('--dry-run', is_flag=True, help='Preview without writing')
-def sync(path: str, output: str, dry_run: bool):
+@click.option('--resolve-symlinks', is_flag=True,
+              help='Resolve symlinks in PATH (slower; default keeps the path as given)')
+def sync(path: str, output: str, dry_run: bool, resolve_symlinks: bool):
     """Scan codebase and generate/update CLAUDE.md.
 
     User-written content outside the auto-generated markers is preserved.
@@ -176,52 +266,216 @@ def sync(path: str, output: str, dry_run: bool):
         cck sync --dry-run          # Preview only
         cck sync --output ctx.md    # Custom output path
     """
-    project_path = Path(path).resolve()
-    output_path = project_path / output if not Path(output).is_absolute() else Path(output)
+    from .scanner import scan_project
+
+    project_path = _project_path(path, resolve_symlinks)
+    output_path = Path(output) if os.path.isabs(output) else project_path / output
 
     console.print(f"[bold blue]Scanning:[/] {project_path}")
 
     # Scan project
-    context = scan_project(project_path)
+    context = scan_project(project_path, use_cache=True)
 
     # Generate CLAUDE.md content
     new_content = generate_claude_md(context)
 
     # Read existing content if present
-    existing_content = ""
+    existing_bytes = b""
     if output_path.exists():
-        existing_content = output_path.read_text()
+        existing_bytes = output_path.read_bytes()
+    existing_content = existing_bytes.decode('utf-8')
 
     # Merge: preserve user content outside markers
     final_content = merge_with_existing(existing_content, new_content)
 
     if dry_run:
         console.print("\n[bold yellow]--- Preview (dry-run) ---[/]\n")
-        console.print(final_content)
+        raw_console.print(final_content)
         console.print("\n[bold yellow]--- End Preview ---[/]")
         return
 
-    output_path.write_text(final_content)
-    console.print(f"[bold green]Written:[/] {output_path}")
+    # Compare bytes, not text, and leave an up-to-date file (and its
+    # mtime) alone
+    final_bytes = final_content.encode('utf-8')
+    if final_bytes == existing_bytes:
+        console.print(f"[dim]No changes:[/dim] {output_path}")
+        return
+
+    _write_atomic(output_path, final_bytes)
+    message = f"[bold green]Written:[/] {output_path}"
     if existing_content:
-        console.print("[dim]User content outside markers preserved[/dim]")
+        message += "\n[dim]User content outside markers preserved[/dim]"
+    console.print(message)
 
 
 @main.command()
 @click.argument('path', type=click.Path(exists=True), default='.')
-def info(path: str):
+@click.option('--resolve-symlinks', is_flag=True,
+              help='Resolve symlinks in PATH (slower; default keeps the path as given)')
+def info(path: str, resolve_symlinks: bool):
     """Show detected project info without generating."""
-    project_path = Path(path).resolve()
+    from .scanner import scan_project
+
+    project_path = _project_path(path, resolve_symlinks)
 
     console.print(f"[bold blue]Analyzing:[/] {project_path}")
 
-    context = scan_project(project_path)
+    context = scan_project(project_path, use_cache=True)
 
-    console.print("\n[bold]Project Type:[/]", context.get('project_type', 'unknown'))
-    console.print("[bold]Languages:[/]", ', '.join(context.get('languages', [])))
-    console.print("[bold]Entry Points:[/]", ', '.join(context.get('entry_points', [])))
-    console.print("[bold]Test Patterns:[/]", ', '.join(context.get('test_patterns', [])))
-    console.print("[bold]Build Commands:[/]", ', '.join(context.get('build_commands', [])))
+    # One print renders and writes the whole report at once
+    console.print("\n".join([
+        f"\n[bold]Project Type:[/] {context.get('project_type', 'unknown')}",
+        f"[bold]Languages:[/] {', '.join(context.get('languages', []))}",
+        f"[bold]Entry Points:[/] {', '.join(context.get('entry_points', []))}",
+        f"[bold]Test Patterns:[/] {', '.join(context.get('test_patterns', []))}",
+        f"[bold]Build Commands:[/] {', '.join(context.get('build_commands', []))}",
+    ]))
+
+
+class _WatchSync:
+    """Keeps CLAUDE.md in sync with the project for watch.
+
+    CLAUDE.md is regenerated on a worker thread so change detection keeps
+    running during a long scan. At most one sync runs at a time; changes
+    arriving meanwhile trigger exactly one more sync when it finishes.
+    """
+
+    def __init__(self, project_path: Path, output_path: Path, history_writer=None):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._project_path = project_path
+        self._output_path = output_path
+        self._history_writer = history_writer
+
+        # Our own CLAUDE.md writes must not trigger another sync;
+        # _write_atomic writes through a symlinked output to its target
+        self._own_files = set()
+        for own_path in {output_path, Path(os.path.realpath(output_path))}:
+            try:
+                own_rel = str(own_path.relative_to(project_path))
+            except ValueError:
+                continue
+            self._own_files.update((own_rel, own_rel + '.tmp'))
+
+        # User content around the auto section as of our last write, the
+        # bytes written and the output's (mtime, size) right after writing them.
+        # The size catches an edit landing within the filesystem's mtime
+        # granularity of our write.
+        self._written_key = None
+        self._written_sections = ("", "")
+        self._written_bytes = None
+        # Scan result behind the last write
+        self._synced_context = None
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._sync_lock = threading.Lock()
+        self._sync_running = False
+        self._resync = False
+
+    def sync(self):
+        """Regenerate CLAUDE.md now, on the calling thread."""
+        from .scanner import scan_project
+
+        output_path = self._output_path
+        context = scan_project(self._project_path, use_cache=True)
+
+        try:
+            st = output_path.stat()
+            output_key = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            output_key = None
+        if output_key is not None and context == self._synced_context:
+            # Most changes (edits to existing files, build artifacts) leave
+            # the scan result as it was: nothing to regenerate or write
+            console.print("[dim]No context change[/dim]")
+            return
+
+        new_content = generate_claude_md(context)
+
+        # Only re-read and re-split the output if someone else touched it
+        # since our write
+        if output_key is None:
+            existing_bytes = None
+            user_before, user_after = "", ""
+        elif output_key == self._written_key:
+            existing_bytes = self._written_bytes
+            user_before, user_after = self._written_sections
+        else:
+            existing_bytes = output_path.read_bytes()
+            user_before, user_after = _split_existing(existing_bytes.decode('utf-8'))
+        final_bytes = _join_sections(user_before, new_content, user_after).encode('utf-8')
+
+        if final_bytes == existing_bytes:
+            # Rewriting identical bytes would only bump the mtime
+            console.print("[dim]No changes[/dim]")
+        else:
+            _write_atomic(output_path, final_bytes)
+            st = output_path.stat()
+            output_key = (st.st_mtime_ns, st.st_size)
+            console.print(f"[green]Synced:[/] {output_path}")
+        self._written_key = output_key
+        self._written_sections = (user_before, user_after)
+        self._written_bytes = final_bytes
+        self._synced_context = context
+
+    def handle_changes(self, changes: List[Tuple[str, str]]):
+        """Record a batch of (event_type, rel_path) changes and sync if needed."""
+        from .scanner import CONTENT_FILES
+
+        changes = [c for c in changes if c[1] not in self._own_files]
+        if not changes:
+            return
+        lines = [f"[yellow]Changes detected: {len(changes)} files[/yellow]"]
+
+        # Record to history DB
+        if self._history_writer is not None:
+            rows = []
+            for event_type, file_path in changes:
+                snippet = None
+                if event_type != 'deleted':
+                    snippet = _read_snippet(self._project_path / file_path)
+                rows.append((event_type, file_path, snippet))
+                lines.append(f"  [dim]{event_type}: {file_path}[/dim]")
+            # Queued: the writer thread commits, trims old entries and
+            # refreshes the socket's text
+            self._history_writer.log_file_changes(rows)
+
+        console.print("\n".join(lines))
+
+        # Edits to files the scanner doesn't read can't change the context;
+        # only adding, removing or renaming files can
+        if (self._synced_context is not None and self._output_path.exists()
+                and all(event_type == 'modified' and file_path not in CONTENT_FILES
+                        for event_type, file_path in changes)):
+            console.print("[dim]No context change[/dim]")
+            return
+        self.request_sync()
+
+    def request_sync(self):
+        """Sync on the worker thread, or once more after the running sync."""
+        with self._sync_lock:
+            if self._sync_running:
+                self._resync = True
+                return
+            self._sync_running = True
+        self._executor.submit(self._run_sync)
+
+    def _run_sync(self):
+        while True:
+            try:
+                self.sync()
+            except Exception as e:
+                console.print(f"[red]Sync failed:[/] {e}")
+            with self._sync_lock:
+                if not self._resync:
+                    self._sync_running = False
+                    return
+                self._resync = False
+
+    def close(self):
+        """Wait for a running sync (and its resync) to finish."""
+        self._executor.shutdown(wait=True)
 
 
 @main.command()
@@ -229,119 +483,174 @@ def info(path: str):
 @click.option('--output', '-o', type=click.Path(), default='CLAUDE.md',
               help='Output file path (default: CLAUDE.md)')
 @click.option('--interval', type=int, default=30,
-              help='Check interval in seconds (default: 30)')
+              help='Poll interval in seconds when watchdog is not installed (default: 30)')
+@click.option('--debounce', type=float, default=0.3,
+              help='Seconds without further changes before syncing (default: 0.3)')
 @click.option('--with-history', is_flag=True,
               help='Record file changes to history database')
-def watch(path: str, output: str, interval: int, with_history: bool):
+@click.option('--resolve-symlinks', is_flag=True,
+              help='Resolve symlinks in PATH (slower; default keeps the path as given)')
+def watch(path: str, output: str, interval: int, debounce: float, with_history: bool,
+          resolve_symlinks: bool):
     """Watch for changes and auto-sync CLAUDE.md.
 
     User-written content outside the auto-generated markers is preserved.
+    Uses OS file notifications when watchdog is installed
+    (pip install claude-context-keeper[watch]), otherwise polls.
 
     Examples:
 
         cck watch                    # Watch current dir
         cck watch ./myproject        # Watch specific dir
         cck watch --interval 60      # Check every 60 seconds
+        cck watch --debounce 1       # Wait for 1s of quiet before syncing
         cck watch --with-history     # Also record changes to history DB
     """
+    import signal
+    import threading
     import time
-    import hashlib
-
-    project_path = Path(path).resolve()
-    output_path = project_path / output if not Path(output).is_absolute() else Path(output)
+    from .config import load_config, watch_exclude_patterns
+    from .history import (
+        init_db, cleanup_old_entries, get_recent_changes, format_recent_changes, HistoryWriter
+    )
+    from .server import start_history_server, SocketInUse, SOCKET_PATH
+    from .watcher import (
+        get_file_states, diff_states, gitignore_names, ExcludePatterns, ChangeCollector, Observer
+    )
+
+    project_path = _project_path(path, resolve_symlinks)
+    output_path = Path(output) if os.path.isabs(output) else project_path / output
 
     # Load config and init history DB if needed
     config = load_config(project_path)
     db_conn = None
+    history_server = None
+    history_writer = None
     if with_history:
         db_path = project_path / config['history']['db_path']
-        db_conn = init_db(db_path)
+        # Written from the HistoryWriter thread once watching starts
+        db_conn = init_db(db_path, check_same_thread=False)
         console.print(f"[dim]History DB: {db_path}[/dim]")
+        for hooks_dir in (project_path / '.claude' / 'hooks', Path.home() / '.claude' / 'hooks'):
+            hook_path = hooks_dir / 'user-prompt-submit.py'
+            if _hook_outdated(hook_path):
+                console.print(OUTDATED_HOOK_HINT.format(hook_path))
+
+        # Serve the formatted history so the hook needn't open the DB
+        try:
+            history_server = start_history_server(project_path)
+        except SocketInUse:
+            console.print(f"[yellow]Another watcher is serving {SOCKET_PATH};"
+                          " not serving history from this one[/yellow]")
+        history_limit = config['reminder']['history_limit']
+
+    def update_history_server():
+        if history_server is not None:
+            history_server.set_text(format_recent_changes(
+                project_path.name, get_recent_changes(db_conn, history_limit)))
+
+    update_history_server()
 
-    console.print(f"[bold blue]Watching:[/] {project_path}")
-    console.print(f"[dim]Interval: {interval}s, Output: {output_path}[/dim]")
+    def after_history_write():
+        cleanup_old_entries(db_conn, config['history']['max_entries'])
+        update_history_server()
+
+    def history_write_failed(e):
+        console.print(f"[red]History write failed:[/] {e}")
+
+    if db_conn:
+        history_writer = HistoryWriter(db_conn, after_history_write, history_write_failed)
+
+    mode = "file events" if Observer is not None else f"polling every {interval}s"
+    lines = [f"[bold blue]Watching:[/] {project_path}",
+             f"[dim]Mode: {mode}, Output: {output_path}[/dim]"]
+    if with_history:
+        lines.append("[dim]Recording file changes to history[/dim]")
+    if history_server is not None:
+        lines.append(f"[dim]Serving history to the hook at {SOCKET_PATH}[/dim]")
+    lines.append("[dim]Press Ctrl+C to stop[/dim]\n")
+    console.print("\n".join(lines))
+
+    # Get exclude patterns from config, plus names the project gitignores
+    exclude_patterns = set(watch_exclude_patterns(config))
+    exclude_patterns.update(gitignore_names(project_path))
     if with_history:
-        console.print("[dim]Recording file changes to history[/dim]")
-    console.print("[dim]Press Ctrl+C to stop[/dim]\n")
+        # SQLite writes sidecar files next to the DB on every commit
+        db_rel = config['history']['db_path']
+        exclude_patterns.update(db_rel + suffix for suffix in ('', '-journal', '-wal', '-shm'))
+        exclude_patterns.add(SOCKET_PATH)
+    exclude_patterns = ExcludePatterns(exclude_patterns)
 
-    # Get exclude patterns from config
-    exclude_patterns = set(config['watch']['exclude'])
+    syncer = _WatchSync(project_path, output_path, history_writer)
 
-    def should_ignore(filepath: Path) -> bool:
-        """Check if file should be ignored."""
-        for pattern in exclude_patterns:
-            if pattern in filepath.parts or str(filepath).endswith(pattern):
-                return True
-        return False
+    # Ctrl+C (or SIGTERM) just asks the loops to stop, so they exit between
+    # batches instead of unwinding from wherever the signal landed, and a
+    # long --interval doesn't delay shutdown
+    stop = threading.Event()
+    collector = None
 
-    def get_file_states(p: Path) -> dict:
-        """Get dict of file paths to mtimes."""
-        states = {}
-        try:
-            for f in p.rglob('*'):
-                if should_ignore(f):
-                    continue
-                if f.is_file():
-                    rel_path = str(f.relative_to(p))
-                    states[rel_path] = f.stat().st_mtime
-        except Exception:
-            pass
-        return states
-
-    last_states = {}
+    def request_stop(signum, frame):
+        stop.set()
+        if collector is not None:
+            collector.wake()
+
+    stop_signals = [signal.SIGINT] + ([signal.SIGTERM] if hasattr(signal, 'SIGTERM') else [])
+    previous_handlers = {sig: signal.signal(sig, request_stop) for sig in stop_signals}
 
     try:
-        while True:
-            current_states = get_file_states(project_path)
-
-            # Detect changes
-            changes = []
-            for path_str, mtime in current_states.items():
-                if path_str not in last_states:
-                    changes.append(('created', path_str))
-                elif last_states[path_str] != mtime:
-                    changes.append(('modified', path_str))
-
-            for path_str in last_states:
-                if path_str not in current_states:
-                    changes.append(('deleted', path_str))
-
-            if changes:
-                console.print(f"[yellow]Changes detected: {len(changes)} files[/yellow]")
-
-                # Record to history DB
-                if db_conn:
-                    for event_type, file_path in changes:
-                        snippet = None
-                        if event_type != 'deleted':
-                            try:
-                                full_path = project_path / file_path
-                                with open(full_path) as f:
-                                    snippet = f.read(200)
-                            except Exception:
-                                pass
-                        log_file_change(db_conn, event_type, file_path, snippet)
-                        console.print(f"  [dim]{event_type}: {file_path}[/dim]")
-
-                    # Cleanup old entries
-                    cleanup_old_entries(db_conn, config['history']['max_entries'])
-
-                # Sync CLAUDE.md
-                context = scan_project(project_path)
-                new_content = generate_claude_md(context)
-
-                existing_content = ""
-                if output_path.exists():
-                    existing_content = output_path.read_text()
-                final_content = merge_with_existing(existing_content, new_content)
-
-                output_path.write_text(final_content)
-                console.print(f"[green]Synced:[/] {output_path}")
+        if Observer is not None:
+            # Event-driven: the OS reports changes, nothing is polled
+            collector = ChangeCollector(project_path, exclude_patterns,
+                                        get_file_states(project_path, exclude_patterns))
+            observer = Observer()
+            observer.schedule(collector, str(project_path), recursive=True)
+            observer.start()
+            try:
+                syncer.request_sync()
+                while not stop.is_set():
+                    changes = collector.wait(timeout=interval, quiet=debounce,
+                                             max_wait=max(interval, 10 * debounce))
+                    if not stop.is_set():
+                        syncer.handle_changes(changes)
+            finally:
+                observer.stop()
+                observer.join()
+        else:
+            last_states = {}
+            dir_cache = {}
+            workers = min(8, os.cpu_count() or 4)
+            while not stop.is_set():
+                current_states = get_file_states(project_path, exclude_patterns, dir_cache,
+                                                 workers)
+
+                # Let a burst (git checkout, save-all) settle before syncing,
+                # but not forever: a file rewritten faster than debounce
+                # would otherwise hold back every other change
+                deadline = time.monotonic() + max(interval, 10 * debounce)
+                while (current_states != last_states and time.monotonic() < deadline
+                       and not stop.wait(debounce)):
+                    settled_states = get_file_states(project_path, exclude_patterns, dir_cache,
+                                                     workers)
+                    if settled_states == current_states:
+                        break
+                    current_states = settled_states
+                if stop.is_set():
+                    break
+
+                syncer.handle_changes(diff_states(last_states, current_states))
                 last_states = current_states
 
-            time.sleep(interval)
-    except KeyboardInterrupt:
+                stop.wait(interval)
         console.print("\n[dim]Watch stopped[/dim]")
+    finally:
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+        # Let an in-flight write finish rather than leave a partial file
+        syncer.close()
+        if history_writer is not None:
+            history_writer.close()
+        if history_server is not None:
+            history_server.close()
 
 
 # Default reminder template
@@ -365,173 +674,42 @@ REMINDER_TEMPLATE = '''# Project Reminders
 ```
 '''
 
-# Hook script template (auto-detect mode)
-HOOK_SCRIPT = '''#!/usr/bin/env python3
-"""CCK User Prompt Submit Hook - Injects project context every turn.
 
-Generated by: cck hook install
-Docs: https://github.com/takawasi/claude-context-keeper
-"""
-import sys
-from pathlib import Path
+# Module the installed user-prompt-submit.py loader imports
+HOOK_MODULE = '_cck_hook.py'
 
-def find_project_root() -> Path:
-    """Find project root by looking for common markers."""
-    cwd = Path.cwd()
-    markers = ['.git', 'package.json', 'pyproject.toml', 'Cargo.toml', 'go.mod']
-    for p in [cwd] + list(cwd.parents):
-        if any((p / m).exists() for m in markers):
-            return p
-    return cwd
-
-def generate_context(root: Path) -> str:
-    """Generate brief project context."""
-    lines = []
-
-    # Detect project type
-    ptype = "unknown"
-    langs = []
-    if (root / 'package.json').exists():
-        ptype = "node"
-        langs.append("JavaScript/TypeScript")
-    elif (root / 'pyproject.toml').exists() or (root / 'setup.py').exists():
-        ptype = "python"
-        langs.append("Python")
-    elif (root / 'Cargo.toml').exists():
-        ptype = "rust"
-        langs.append("Rust")
-    elif (root / 'go.mod').exists():
-        ptype = "go"
-        langs.append("Go")
-
-    lines.append(f"[CCK] {root.name} ({ptype})")
-    if langs:
-        lines.append(f"Languages: {', '.join(langs)}")
-
-    return '\\n'.join(lines)
-
-if __name__ == "__main__":
-    try:
-        root = find_project_root()
-        context = generate_context(root)
-        sys.stdout.write(context)
-    except Exception:
-        pass  # Fail silently to not break Claude Code
-'''
 
-# Hook script template (reminder.md mode)
-HOOK_SCRIPT_REMINDER = '''#!/usr/bin/env python3
-"""CCK User Prompt Submit Hook - Reads reminder.md for per-turn context.
+def _hook_script(name: str) -> bytes:
+    """Read a hook script shipped in cck/_hooks."""
+    from importlib import resources
 
-Generated by: cck hook install --use-reminder
-Docs: https://github.com/takawasi/claude-context-keeper
+    return resources.files('cck._hooks').joinpath(f'{name}.py').read_bytes()
 
-This hook reads .claude/reminder.md (or reminder.md) and outputs its content.
-Edit the reminder.md file to customize what context is injected each turn.
-"""
-import sys
-from pathlib import Path
 
-def find_project_root() -> Path:
-    """Find project root by looking for common markers."""
-    cwd = Path.cwd()
-    markers = ['.git', 'package.json', 'pyproject.toml', 'Cargo.toml', 'go.mod']
-    for p in [cwd] + list(cwd.parents):
-        if any((p / m).exists() for m in markers):
-            return p
-    return cwd
-
-def get_reminder(root: Path) -> str:
-    """Read reminder.md content."""
-    # Check multiple locations
-    candidates = [
-        root / '.claude' / 'reminder.md',
-        root / 'reminder.md',
-    ]
-
-    for path in candidates:
-        if path.exists():
-            return path.read_text().strip()
-
-    # Fallback: basic project info
-    return f"[CCK] {root.name} - No reminder.md found"
-
-if __name__ == "__main__":
-    try:
-        root = find_project_root()
-        reminder = get_reminder(root)
-        sys.stdout.write(reminder)
-    except Exception:
-        pass  # Fail silently to not break Claude Code
-'''
-
-# Hook script template (history mode - reads from SQLite DB)
-HOOK_SCRIPT_HISTORY = '''#!/usr/bin/env python3
-"""CCK User Prompt Submit Hook - Reads history from SQLite database.
-
-Generated by: cck hook install --use-history
-Docs: https://github.com/takawasi/claude-context-keeper
-
-This hook reads file change history from .claude/cck_history.sqlite
-and outputs recent operations for context injection each turn.
-
-Requires: cck watch --with-history running in background
-"""
-import sys
-import sqlite3
-from pathlib import Path
+def _remove_hook_module(hooks_dir: Path):
+    """Remove the hook module installed next to the loader, and its .pyc."""
+    from importlib.util import cache_from_source
 
-def find_project_root() -> Path:
-    """Find project root by looking for common markers."""
-    cwd = Path.cwd()
-    markers = ['.git', 'package.json', 'pyproject.toml', 'Cargo.toml', 'go.mod']
-    for p in [cwd] + list(cwd.parents):
-        if any((p / m).exists() for m in markers):
-            return p
-    return cwd
+    module_path = hooks_dir / HOOK_MODULE
+    module_path.unlink(missing_ok=True)
+    Path(cache_from_source(str(module_path))).unlink(missing_ok=True)
 
-def get_history(root: Path, limit: int = 20) -> str:
-    """Read history from SQLite database."""
-    db_path = root / '.claude' / 'cck_history.sqlite'
 
-    if not db_path.exists():
-        return f"[CCK] {root.name} - No history DB (run: cck watch --with-history)"
+def _hook_outdated(hook_path: Path) -> bool:
+    """Whether hook_path is a CCK hook from before the loader was installed.
 
+    Those hooks carry their own copy of the history query and slice ISO
+    timestamps, which fails on a database migrated to integer timestamps.
+    """
     try:
-        conn = sqlite3.connect(str(db_path))
-        conn.row_factory = sqlite3.Row
-
-        # Get recent file changes
-        cursor = conn.execute(
-            'SELECT timestamp, event_type, file_path FROM file_changes ORDER BY timestamp DESC LIMIT ?',
-            (limit,)
-        )
-        changes = cursor.fetchall()
-        conn.close()
-
-        if not changes:
-            return f"[CCK] {root.name} - No recent changes"
-
-        lines = [f"[CCK] {root.name} - Recent changes:"]
-        event_map = {'created': '+', 'modified': '~', 'deleted': '-'}
-        for row in changes:
-            ts = row['timestamp'][11:19]  # HH:MM:SS
-            symbol = event_map.get(row['event_type'], '?')
-            lines.append(f"  {ts} {symbol} {row['file_path']}")
-
-        return '\\n'.join(lines)
+        content = hook_path.read_text()
+    except (OSError, UnicodeDecodeError):
+        return False
+    return 'CCK' in content and 'from _cck_hook import' not in content
 
-    except Exception as e:
-        return f"[CCK] {root.name} - History error: {e}"
 
-if __name__ == "__main__":
-    try:
-        root = find_project_root()
-        history = get_history(root)
-        sys.stdout.write(history)
-    except Exception:
-        pass  # Fail silently to not break Claude Code
-'''
+OUTDATED_HOOK_HINT = ("[yellow]Hook installed by an earlier CCK version:[/] {}\n"
+                      "[dim]Reinstall it with 'cck hook remove' then 'cck hook install'[/dim]")
 
 
 @main.group()
@@ -550,7 +728,9 @@ def hook():
               help='Use reminder.md mode instead of auto-detect')
 @click.option('--use-history', is_flag=True,
               help='Use history mode (reads from SQLite DB)')
-def hook_install(is_global: bool, use_reminder: bool, use_history: bool):
+@click.option('--no-site', is_flag=True,
+              help="Run the hook with 'python3 -S' (skips site-packages setup; needs env -S)")
+def hook_install(is_global: bool, use_reminder: bool, use_history: bool, no_site: bool):
     """Install CCK hook for UserPromptSubmit.
 
     This injects brief project context on every turn, not just session start.
@@ -566,6 +746,7 @@ def hook_install(is_global: bool, use_reminder: bool, use_history: bool):
         cck hook install --use-reminder   # Read reminder.md
         cck hook install --use-history    # Read from history DB (CB-style)
         cck hook install --global         # Install to ~/.claude/hooks
+        cck hook install --no-site        # Faster interpreter start
     """
     if is_global:
         hooks_dir = Path.home() / '.claude' / 'hooks'
@@ -576,30 +757,44 @@ def hook_install(is_global: bool, use_reminder: bool, use_history: bool):
     hook_path = hooks_dir / 'user-prompt-submit.py'
 
     if hook_path.exists():
-        console.print(f"[yellow]Hook already exists:[/] {hook_path}")
-        console.print("[dim]Use 'cck hook remove' first to reinstall[/dim]")
+        console.print(f"[yellow]Hook already exists:[/] {hook_path}\n"
+                      "[dim]Use 'cck hook remove' first to reinstall[/dim]")
         return
 
     # Choose script based on mode
     if use_history:
-        hook_path.write_text(HOOK_SCRIPT_HISTORY)
+        script = 'history'
         mode_desc = "history mode (SQLite DB)"
     elif use_reminder:
-        hook_path.write_text(HOOK_SCRIPT_REMINDER)
+        script = 'reminder'
         mode_desc = "reminder.md mode"
     else:
-        hook_path.write_text(HOOK_SCRIPT)
+        script = 'auto'
         mode_desc = "auto-detect mode"
 
-    hook_path.chmod(0o755)
+    # The hook runs on every turn. A script run directly is recompiled each
+    # time, so install it as a precompiled module behind a small loader.
+    import py_compile
+    module_path = hooks_dir / HOOK_MODULE
+    module_path.write_bytes(_hook_script(script))
+    try:
+        py_compile.compile(str(module_path), doraise=True)
+    except OSError:
+        pass  # Not fatal: the import compiles it instead
+    loader = _hook_script('loader')
+    if no_site:
+        # The hooks only use the stdlib, so site's .pth scanning is wasted
+        loader = loader.replace(b'#!/usr/bin/env python3\n', b'#!/usr/bin/env -S python3 -S\n', 1)
+    hook_path.write_bytes(loader)
 
-    console.print(f"[bold green]Hook installed:[/] {hook_path}")
-    console.print(f"[dim]Mode: {mode_desc}[/dim]")
+    hook_path.chmod(0o755)
 
+    lines = [f"[bold green]Hook installed:[/] {hook_path}", f"[dim]Mode: {mode_desc}[/dim]"]
     if use_history:
-        console.print("[dim]Start file watcher: cck watch --with-history[/dim]")
+        lines.append("[dim]Start file watcher: cck watch --with-history[/dim]")
     elif use_reminder:
-        console.print("[dim]Create .claude/reminder.md with 'cck reminder init'[/dim]")
+        lines.append("[dim]Create .claude/reminder.md with 'cck reminder init'[/dim]")
+    console.print("\n".join(lines))
 
 
 @hook.command('status')
@@ -618,7 +813,9 @@ def hook_status(is_global: bool):
         console.print(f"[bold green]{location} hook installed:[/] {hook_path}")
         # Check if it's CCK hook
         content = hook_path.read_text()
-        if 'CCK' in content:
+        if _hook_outdated(hook_path):
+            console.print(OUTDATED_HOOK_HINT.format(hook_path))
+        elif 'CCK' in content:
             console.print("[dim]This is a CCK-generated hook[/dim]")
         else:
             console.print("[yellow]This hook was not generated by CCK[/yellow]")
@@ -643,11 +840,12 @@ def hook_remove(is_global: bool):
     # Safety check
     content = hook_path.read_text()
     if 'CCK' not in content:
-        console.print("[yellow]Warning: This hook was not generated by CCK[/yellow]")
-        console.print("[yellow]Skipping removal to avoid breaking custom hooks[/yellow]")
+        console.print("[yellow]Warning: This hook was not generated by CCK\n"
+                      "Skipping removal to avoid breaking custom hooks[/yellow]")
         return
 
     hook_path.unlink()
+    _remove_hook_module(hook_path.parent)
     console.print(f"[bold green]Hook removed:[/] {hook_path}")
 
 
@@ -656,6 +854,8 @@ def hook_remove(is_global: bool):
               help='Test reminder.md mode instead of auto-detect')
 def hook_test(use_reminder: bool):
     """Test hook output (preview what would be injected)."""
+    from .scanner import scan_project
+
     project_path = Path.cwd()
 
     if use_reminder:
@@ -666,17 +866,16 @@ def hook_test(use_reminder: bool):
         ]
         for path in candidates:
             if path.exists():
-                console.print(f"[bold blue]Reminder found:[/] {path}")
-                console.print("[bold blue]Content:[/]")
-                console.print(path.read_text())
+                console.print(f"[bold blue]Reminder found:[/] {path}\n[bold blue]Content:[/]")
+                raw_console.print(path.read_text())
                 return
-        console.print("[yellow]No reminder.md found[/yellow]")
-        console.print("[dim]Create one with: cck reminder init[/dim]")
+        console.print("[yellow]No reminder.md found[/yellow]\n"
+                      "[dim]Create one with: cck reminder init[/dim]")
     else:
-        context = scan_project(project_path)
+        context = scan_project(project_path, use_cache=True)
         brief = generate_brief_context(context)
         console.print("[bold blue]Hook output preview (auto-detect):[/]")
-        console.print(brief)
+        raw_console.print(brief)
 
 
 @main.group()
@@ -715,9 +914,9 @@ def reminder_init(in_claude_dir: bool, in_root: bool):
         return
 
     reminder_path.write_text(REMINDER_TEMPLATE)
-    console.print(f"[bold green]Created:[/] {reminder_path}")
-    console.print("[dim]Edit this file to customize per-turn context[/dim]")
-    console.print("[dim]Then install hook with: cck hook install --use-reminder[/dim]")
+    console.print(f"[bold green]Created:[/] {reminder_path}\n"
+                  "[dim]Edit this file to customize per-turn context\n"
+                  "Then install hook with: cck hook install --use-reminder[/dim]")
 
 
 @reminder.command('show')
@@ -731,13 +930,11 @@ def reminder_show():
 
     for path in candidates:
         if path.exists():
-            console.print(f"[bold blue]Found:[/] {path}")
-            console.print("")
-            console.print(path.read_text())
+            console.print(f"[bold blue]Found:[/] {path}\n")
+            raw_console.print(path.read_text())
             return
 
-    console.print("[dim]No reminder.md found[/dim]")
-    console.print("[dim]Create one with: cck reminder init[/dim]")
+    console.print("[dim]No reminder.md found\nCreate one with: cck reminder init[/dim]")
 
 
 if __name__ == '__main__':
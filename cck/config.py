@@ -1,8 +1,7 @@
 """CCK Configuration management."""
 
 from pathlib import Path
-from typing import Dict, Any, Optional
-import yaml
+from typing import Dict, Any, List, Optional, Tuple
 
 DEFAULT_CONFIG = {
     'version': 1,
@@ -15,6 +14,19 @@ DEFAULT_CONFIG = {
             '__pycache__',
             '.venv',
             'venv',
+            # Build output and tool caches: often huge, never context
+            'target',
+            'dist',
+            'build',
+            '.next',
+            '.pytest_cache',
+            '.mypy_cache',
+            '.tox',
+            '.cache',
+            'coverage',
+            '.gradle',
+            '.idea',
+            '.vscode',
             '.claude/cck_history.sqlite',
         ],
     },
@@ -61,6 +73,18 @@ watch:
     - __pycache__
     - .venv
     - venv
+    - target
+    - dist
+    - build
+    - .next
+    - .pytest_cache
+    - .mypy_cache
+    - .tox
+    - .cache
+    - coverage
+    - .gradle
+    - .idea
+    - .vscode
 
 history:
   enabled: true
@@ -75,6 +99,21 @@ reminder:
   format: compact
 """
 
+# CONFIG_TEMPLATE_CB_STYLE around the two values setup lets the user pick,
+# split once so rendering is plain concatenation
+_CB_WATCH_PATHS = "    - .  # Monitor entire project"
+_CB_HISTORY_LIMIT = "history_limit: 20"
+_cb_head, _cb_rest = CONFIG_TEMPLATE_CB_STYLE.split(_CB_WATCH_PATHS)
+_cb_middle, _cb_tail = _cb_rest.split(_CB_HISTORY_LIMIT)
+CB_STYLE_PARTS = (_cb_head, _cb_middle, _cb_tail)
+
+
+def render_cb_style_config(watch_paths: List[str], history_limit: str) -> str:
+    """Fill the CB-style template with the user's watch paths and history limit."""
+    head, middle, tail = CB_STYLE_PARTS
+    watch_yaml = "\n".join(f"    - {p}" for p in watch_paths)
+    return f"{head}{watch_yaml}{middle}history_limit: {history_limit}{tail}"
+
 
 def find_config_path(project_root: Path) -> Optional[Path]:
     """Find CCK config file in project."""
@@ -90,19 +129,37 @@ def find_config_path(project_root: Path) -> Optional[Path]:
     return None
 
 
+# Config path -> (mtime_ns, merged config)
+_config_cache: Dict[Path, Tuple[int, Dict[str, Any]]] = {}
+
+
 def load_config(project_root: Path) -> Dict[str, Any]:
-    """Load CCK config, falling back to defaults."""
+    """Load CCK config, falling back to defaults.
+
+    Parsed configs are cached until the file's mtime changes, so the
+    result is shared between calls and must not be modified.
+    """
     config_path = find_config_path(project_root)
 
     if config_path is None:
         return DEFAULT_CONFIG.copy()
 
     try:
+        mtime_ns = config_path.stat().st_mtime_ns
+        cached = _config_cache.get(config_path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        # yaml is slow to import and only needed once there is a file to parse
+        import yaml
+
         with open(config_path) as f:
             user_config = yaml.safe_load(f) or {}
 
         # Merge with defaults
-        return deep_merge(DEFAULT_CONFIG, user_config)
+        config = deep_merge(DEFAULT_CONFIG, user_config)
+        _config_cache[config_path] = (mtime_ns, config)
+        return config
     except Exception:
         return DEFAULT_CONFIG.copy()
 
@@ -118,6 +175,24 @@ def deep_merge(base: Dict, override: Dict) -> Dict:
     return result
 
 
+def watch_exclude_patterns(config: Dict[str, Any]) -> List[str]:
+    """Return watch.exclude, keeping extension-style entries working.
+
+    Exclude names now match whole file or directory names, but earlier
+    versions matched any path ending in the entry. An entry like '.log'
+    or '.pyc' that isn't one of the default names is therefore also
+    kept as the glob '*.log'.
+    """
+    defaults = DEFAULT_CONFIG['watch']['exclude']
+    patterns = []
+    for pattern in config['watch']['exclude']:
+        patterns.append(pattern)
+        if (len(pattern) > 1 and pattern[0] == '.' and pattern not in defaults
+                and not any(c in pattern for c in '/*?[')):
+            patterns.append('*' + pattern)
+    return patterns
+
+
 def save_config(project_root: Path, config_content: str, in_claude_dir: bool = True) -> Path:
     """Save config file to project."""
     if in_claude_dir:
@@ -1,21 +1,88 @@
 """CCK History tracking - File changes and operations logging."""
 
+import queue
 import sqlite3
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Callable, Iterable, NamedTuple, Optional, Tuple, Union
 
+INSERT_FILE_CHANGE = (
+    'INSERT INTO file_changes (timestamp, event_type, file_path, snippet) VALUES (?, ?, ?, ?)'
+)
+INSERT_OPERATION = 'INSERT INTO operations (timestamp, operation_type, summary) VALUES (?, ?, ?)'
 
-def init_db(db_path: Path) -> sqlite3.Connection:
-    """Initialize history database."""
+# Stored lengths: the history is only ever shown this much of a file's
+# first lines or an operation's summary, so trim once on write
+SNIPPET_CHARS = 80
+SUMMARY_CHARS = 200
+
+# Rows cleanup_old_entries deletes per transaction
+CLEANUP_CHUNK = 500
+
+# PRAGMA user_version of the current schema: 1 stores timestamps as integer
+# microseconds since the epoch (0 stored ISO strings)
+SCHEMA_VERSION = 1
+
+
+def now_us() -> int:
+    """Current time in microseconds since the epoch, as stored in timestamp."""
+    return time.time_ns() // 1000
+
+
+def format_timestamp(timestamp: int, fmt: str = '%H:%M:%S') -> str:
+    """Format a stored timestamp in local time."""
+    return datetime.fromtimestamp(timestamp / 1e6).strftime(fmt)
+
+
+def init_db(db_path: Path, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Initialize history database.
+
+    Pass check_same_thread=False to hand the connection to a HistoryWriter.
+    """
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
+    conn = sqlite3.connect(str(db_path), check_same_thread=check_same_thread)
+    # WAL lets the hook read while watch writes, and with synchronous=NORMAL
+    # a commit no longer waits for an fsync
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    # Watch keeps this connection for its whole run: let the page cache hold
+    # both tables, and keep ORDER BY / UNION temporaries off disk
+    conn.execute('PRAGMA cache_size=-8000')
+    conn.execute('PRAGMA temp_store=MEMORY')
+
+    # One explicit transaction: the legacy sqlite3 mode would otherwise
+    # autocommit each DDL statement, and a migration interrupted after the
+    # renames would leave the old rows stranded in the v0 tables
+    conn.execute('BEGIN')
+    try:
+        _create_schema(conn)
+    except BaseException:
+        conn.close()  # Rolls back
+        raise
+    conn.commit()
+    return conn
+
+
+def _create_schema(conn: sqlite3.Connection):
+    """Create tables and indexes, migrating a version 0 DB."""
+    # A version 0 DB has ISO string timestamps: move its tables aside and
+    # copy the rows over once the new ones exist
+    migrate = (conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION
+               and conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table'"
+                                " AND name = 'file_changes'").fetchone() is not None)
+    if migrate:
+        for index in ('idx_file_changes_timestamp', 'idx_operations_timestamp',
+                      'idx_file_changes_ts_id', 'idx_operations_ts_id'):
+            conn.execute(f'DROP INDEX IF EXISTS {index}')
+        conn.execute('ALTER TABLE file_changes RENAME TO file_changes_v0')
+        conn.execute('ALTER TABLE operations RENAME TO operations_v0')
 
     conn.execute('''
         CREATE TABLE IF NOT EXISTS file_changes (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
             event_type TEXT NOT NULL,  -- 'created' | 'modified' | 'deleted'
             file_path TEXT NOT NULL,
             snippet TEXT  -- First few lines for context
@@ -25,125 +92,305 @@ def init_db(db_path: Path) -> sqlite3.Connection:
     conn.execute('''
         CREATE TABLE IF NOT EXISTS operations (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
             operation_type TEXT NOT NULL,  -- 'Bash' | 'Read' | 'Edit' | 'Task' | etc
             summary TEXT NOT NULL
         )
     ''')
 
+    # id orders rows logged within the same microsecond, so newest-first
+    # reads and the combined-history merge are served straight from the
+    # index with no temp b-tree sort
     conn.execute('''
-        CREATE INDEX IF NOT EXISTS idx_file_changes_timestamp
-        ON file_changes(timestamp DESC)
+        CREATE INDEX IF NOT EXISTS idx_file_changes_ts_id
+        ON file_changes(timestamp DESC, id DESC)
     ''')
 
     conn.execute('''
-        CREATE INDEX IF NOT EXISTS idx_operations_timestamp
-        ON operations(timestamp DESC)
+        CREATE INDEX IF NOT EXISTS idx_operations_ts_id
+        ON operations(timestamp DESC, id DESC)
     ''')
 
-    conn.commit()
-    return conn
+    if migrate:
+        _copy_v0_rows(conn)
+    conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+
+
+def _copy_v0_rows(conn: sqlite3.Connection):
+    """Copy rows from version 0 tables, converting ISO timestamps, and drop them."""
+    def to_us(iso: str) -> int:
+        # Naive ISO strings were written in local time, as timestamp() assumes
+        return round(datetime.fromisoformat(iso).timestamp() * 1e6)
+
+    conn.executemany(
+        'INSERT INTO file_changes (id, timestamp, event_type, file_path, snippet)'
+        ' VALUES (?, ?, ?, ?, ?)',
+        [(row[0], to_us(row[1]), row[2], row[3], row[4]) for row in conn.execute(
+            'SELECT id, timestamp, event_type, file_path, snippet FROM file_changes_v0')]
+    )
+    conn.executemany(
+        'INSERT INTO operations (id, timestamp, operation_type, summary) VALUES (?, ?, ?, ?)',
+        [(row[0], to_us(row[1]), row[2], row[3]) for row in conn.execute(
+            'SELECT id, timestamp, operation_type, summary FROM operations_v0')]
+    )
+    conn.execute('DROP TABLE file_changes_v0')
+    conn.execute('DROP TABLE operations_v0')
+
+
+def _file_change_row(timestamp: int, event_type: str, file_path: str,
+                     snippet: Optional[str]) -> Tuple:
+    return (timestamp, event_type, file_path, snippet and snippet[:SNIPPET_CHARS])
+
+
+def _operation_row(timestamp: int, operation_type: str, summary: str) -> Tuple:
+    return (timestamp, operation_type, summary[:SUMMARY_CHARS])
 
 
 def log_file_change(conn: sqlite3.Connection, event_type: str, file_path: str, snippet: str = None):
     """Log a file change event."""
-    timestamp = datetime.now().isoformat()
+    timestamp = now_us()
     conn.execute(
-        'INSERT INTO file_changes (timestamp, event_type, file_path, snippet) VALUES (?, ?, ?, ?)',
-        (timestamp, event_type, file_path, snippet)
+        INSERT_FILE_CHANGE,
+        _file_change_row(timestamp, event_type, file_path, snippet)
+    )
+    conn.commit()
+
+
+def log_file_changes(conn: sqlite3.Connection,
+                     changes: Iterable[Tuple[str, str, Optional[str]]]):
+    """Log (event_type, file_path, snippet) file change events in one transaction."""
+    conn.executemany(
+        INSERT_FILE_CHANGE,
+        [_file_change_row(now_us(), event_type, file_path, snippet)
+         for event_type, file_path, snippet in changes]
     )
     conn.commit()
 
 
 def log_operation(conn: sqlite3.Connection, operation_type: str, summary: str):
     """Log an operation."""
-    timestamp = datetime.now().isoformat()
+    timestamp = now_us()
     conn.execute(
-        'INSERT INTO operations (timestamp, operation_type, summary) VALUES (?, ?, ?)',
-        (timestamp, operation_type, summary)
+        INSERT_OPERATION,
+        _operation_row(timestamp, operation_type, summary)
     )
     conn.commit()
 
 
-def get_recent_changes(conn: sqlite3.Connection, limit: int = 20) -> List[Dict[str, Any]]:
+def log_operations(conn: sqlite3.Connection, operations: Iterable[Tuple[str, str]]):
+    """Log (operation_type, summary) operations in one transaction."""
+    conn.executemany(
+        INSERT_OPERATION,
+        [_operation_row(now_us(), operation_type, summary)
+         for operation_type, summary in operations]
+    )
+    conn.commit()
+
+
+class HistoryWriter:
+    """Write history rows on a background thread, in one transaction per drain.
+
+    Logging just queues the rows, so the caller never waits on SQLite.
+    Everything queued while a transaction commits goes into the next one.
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self, conn: sqlite3.Connection,
+                 on_write: Optional[Callable[[], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        self._conn = conn
+        self._on_write = on_write
+        self._on_error = on_error
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def log_file_changes(self, changes: Iterable[Tuple[str, str, Optional[str]]]):
+        """Queue (event_type, file_path, snippet) file change events."""
+        timestamp = now_us()
+        for event_type, file_path, snippet in changes:
+            self._queue.put((INSERT_FILE_CHANGE,
+                             _file_change_row(timestamp, event_type, file_path, snippet)))
+
+    def log_operations(self, operations: Iterable[Tuple[str, str]]):
+        """Queue (operation_type, summary) operations."""
+        timestamp = now_us()
+        for operation_type, summary in operations:
+            self._queue.put((INSERT_OPERATION,
+                             _operation_row(timestamp, operation_type, summary)))
+
+    def flush(self):
+        """Block until everything queued so far is committed."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Commit what is queued and stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self.BATCH_SIZE:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = {INSERT_FILE_CHANGE: [], INSERT_OPERATION: []}
+            for item in items:
+                if isinstance(item, tuple):
+                    rows[item[0]].append(item[1])
+
+            if rows[INSERT_FILE_CHANGE] or rows[INSERT_OPERATION]:
+                try:
+                    with self._conn:
+                        for sql, params in rows.items():
+                            if params:
+                                self._conn.executemany(sql, params)
+                    if self._on_write is not None:
+                        self._on_write()
+                except Exception as e:
+                    # Losing a batch of history mustn't stop later ones
+                    if self._on_error is not None:
+                        self._on_error(e)
+
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in items:
+                return
+
+
+class FileChange(NamedTuple):
+    """A file_changes row."""
+    timestamp: int
+    event_type: str
+    file_path: str
+    snippet: Optional[str]
+
+
+class Operation(NamedTuple):
+    """An operations row."""
+    timestamp: int
+    operation_type: str
+    summary: str
+
+
+def get_recent_changes(conn: sqlite3.Connection, limit: int = 20) -> List[FileChange]:
     """Get recent file changes."""
     cursor = conn.execute(
-        'SELECT * FROM file_changes ORDER BY timestamp DESC LIMIT ?',
+        'SELECT timestamp, event_type, file_path, snippet FROM file_changes'
+        ' ORDER BY timestamp DESC, id DESC LIMIT ?',
         (limit,)
     )
-    return [dict(row) for row in cursor.fetchall()]
+    return [FileChange(*row) for row in cursor.fetchall()]
 
 
-def get_recent_operations(conn: sqlite3.Connection, limit: int = 20) -> List[Dict[str, Any]]:
+def get_recent_operations(conn: sqlite3.Connection, limit: int = 20) -> List[Operation]:
     """Get recent operations."""
     cursor = conn.execute(
-        'SELECT * FROM operations ORDER BY timestamp DESC LIMIT ?',
+        'SELECT timestamp, operation_type, summary FROM operations'
+        ' ORDER BY timestamp DESC, id DESC LIMIT ?',
         (limit,)
     )
-    return [dict(row) for row in cursor.fetchall()]
+    return [Operation(*row) for row in cursor.fetchall()]
 
 
-def get_combined_history(conn: sqlite3.Connection, limit: int = 20) -> List[Dict[str, Any]]:
+def get_combined_history(conn: sqlite3.Connection,
+                         limit: int = 20) -> List[Union[FileChange, Operation]]:
     """Get combined history of file changes and operations, sorted by time."""
-    # Get file changes
-    changes = get_recent_changes(conn, limit)
-    for c in changes:
-        c['category'] = 'file'
+    # SQLite merges the two timestamp-ordered index scans and stops at
+    # limit rows, instead of us fetching limit rows from each and sorting.
+    # An operation's type and summary come back in event_type and file_path.
+    cursor = conn.execute('''
+        SELECT timestamp, id, 1 AS is_file, event_type, file_path, snippet
+        FROM file_changes
+        UNION ALL
+        SELECT timestamp, id, 0, operation_type, summary, NULL
+        FROM operations
+        ORDER BY timestamp DESC, id DESC LIMIT ?
+    ''', (limit,))
+    return [FileChange(ts, a, b, snippet) if is_file else Operation(ts, a, b)
+            for ts, _, is_file, a, b, snippet in cursor.fetchall()]
 
-    # Get operations
-    ops = get_recent_operations(conn, limit)
-    for o in ops:
-        o['category'] = 'operation'
 
-    # Combine and sort
-    combined = changes + ops
-    combined.sort(key=lambda x: x['timestamp'], reverse=True)
+EVENT_SYMBOLS = {'created': '+', 'modified': '~', 'deleted': '-'}
 
-    return combined[:limit]
 
-
-def format_history_compact(history: List[Dict[str, Any]]) -> str:
+def format_history_compact(history: List[Union[FileChange, Operation]]) -> str:
     """Format history in compact form for reminder injection."""
     lines = []
     for item in history:
-        ts = item['timestamp'][11:19]  # Extract HH:MM:SS
-        if item['category'] == 'file':
-            event_map = {'created': '+', 'modified': '~', 'deleted': '-'}
-            symbol = event_map.get(item['event_type'], '?')
-            lines.append(f"{ts} {symbol} {item['file_path']}")
+        ts = format_timestamp(item.timestamp)
+        if isinstance(item, FileChange):
+            symbol = EVENT_SYMBOLS.get(item.event_type, '?')
+            lines.append(f"{ts} {symbol} {item.file_path}")
         else:
-            lines.append(f"{ts} $ {item['operation_type']}: {item['summary'][:40]}")
+            lines.append(f"{ts} $ {item.operation_type}: {item.summary[:40]}")
 
     return '\n'.join(lines)
 
 
-def format_history_detailed(history: List[Dict[str, Any]]) -> str:
+def format_recent_changes(project_name: str, changes: List[FileChange]) -> str:
+    """Format recent file changes exactly as the history hook prints them."""
+    if not changes:
+        return f"[CCK] {project_name} - No recent changes"
+
+    lines = [f"[CCK] {project_name} - Recent changes:"]
+    for item in changes:
+        ts = format_timestamp(item.timestamp)
+        symbol = EVENT_SYMBOLS.get(item.event_type, '?')
+        lines.append(f"  {ts} {symbol} {item.file_path}")
+
+    return '\n'.join(lines)
+
+
+def format_history_detailed(history: List[Union[FileChange, Operation]]) -> str:
     """Format history in detailed form."""
     lines = []
     for item in history:
-        ts = item['timestamp'][:19].replace('T', ' ')
-        if item['category'] == 'file':
-            lines.append(f"[{ts}] File {item['event_type']}: {item['file_path']}")
-            if item.get('snippet'):
-                lines.append(f"  > {item['snippet'][:80]}")
+        ts = format_timestamp(item.timestamp, '%Y-%m-%d %H:%M:%S')
+        if isinstance(item, FileChange):
+            lines.append(f"[{ts}] File {item.event_type}: {item.file_path}")
+            if item.snippet:
+                lines.append(f"  > {item.snippet}")
         else:
-            lines.append(f"[{ts}] {item['operation_type']}: {item['summary']}")
+            lines.append(f"[{ts}] {item.operation_type}: {item.summary}")
 
     return '\n'.join(lines)
 
 
 def cleanup_old_entries(conn: sqlite3.Connection, max_entries: int = 1000):
-    """Remove old entries beyond max_entries."""
-    conn.execute('''
-        DELETE FROM file_changes WHERE id NOT IN (
-            SELECT id FROM file_changes ORDER BY timestamp DESC LIMIT ?
-        )
-    ''', (max_entries,))
+    """Remove old entries beyond max_entries.
 
-    conn.execute('''
-        DELETE FROM operations WHERE id NOT IN (
-            SELECT id FROM operations ORDER BY timestamp DESC LIMIT ?
-        )
-    ''', (max_entries,))
+    Rows go CLEANUP_CHUNK at a time, each chunk its own transaction, so a
+    big trim never holds the write lock for long; after one, the WAL is
+    checkpointed and truncated instead of staying at its peak size.
+    """
+    deleted = 0
+    for table in ('file_changes', 'operations'):
+        # The newest row past the limit bounds a range delete on the
+        # timestamp index; id breaks ties between same-microsecond rows
+        cutoff = conn.execute(
+            f'SELECT timestamp, id FROM {table} ORDER BY timestamp DESC, id DESC LIMIT 1 OFFSET ?',
+            (max_entries,)
+        ).fetchone()
+        if cutoff is None:
+            continue
+        while True:
+            count = conn.execute(
+                f'DELETE FROM {table} WHERE id IN ('
+                f'SELECT id FROM {table} WHERE (timestamp, id) <= (?, ?) LIMIT ?)',
+                (*cutoff, CLEANUP_CHUNK)
+            ).rowcount
+            conn.commit()
+            deleted += count
+            if count < CLEANUP_CHUNK:
+                break
 
-    conn.commit()
+    if deleted >= CLEANUP_CHUNK:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
@@ -1,12 +1,169 @@
 """Project scanner - Extract context from codebase."""
 
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable, FrozenSet, Iterable, Match, Optional, Tuple
+import fnmatch
+import hashlib
 import json
+import os
+import re
+import time
 import tomllib
 
+from . import __version__
 
-def scan_project(path: Path) -> Dict[str, Any]:
+# The only files whose contents scan_project reads (all at the project
+# root); every other input is a file or directory name
+CONTENT_FILES = frozenset({'pyproject.toml', 'package.json', 'Makefile'})
+
+# Directories the walk never enters: VCS metadata, virtualenvs, installed
+# packages and build or tool output
+IGNORE_DIRS = frozenset({
+    '.git', '__pycache__', 'node_modules', '.venv', 'venv', '.tox', 'dist', 'build',
+    'site-packages', '.pytest_cache',
+})
+
+# Makefile targets listed as build commands
+MAX_MAKE_TARGETS = 50
+
+# Directory levels below the root shown in the structure tree
+STRUCTURE_DEPTH = 2
+
+# Projects kept in the scan cache, least recently scanned dropped first
+SCAN_CACHE_SIZE = 16
+
+# A directory or file modified this close to the scan may change again
+# within the same mtime tick without its stamp changing, so the result
+# isn't cached (the usual racy-timestamp guard)
+RACY_NS = 2_000_000_000
+
+
+def scan_cache_dir() -> Path:
+    """Where scan results are cached across runs, one file per project."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'cck' / 'scan'
+
+
+def scan_cache_path(path: Path) -> Path:
+    """The cache file for the project at path."""
+    digest = hashlib.blake2b(str(path).encode(), digest_size=16).hexdigest()
+    return scan_cache_dir() / f'{digest}.json'
+
+
+class _Tree:
+    """Everything the scan needs from the directory tree, from one walk.
+
+    files lists each file's path parts relative to the root, in walk order.
+    by_name indexes them by file name. listings holds the (name, is_dir)
+    entries of directories within STRUCTURE_DEPTH of the root. root_names
+    is the set of names at the root, for existence checks without a stat().
+    dirs lists every directory walked. dir_stamps holds their stat() stamps,
+    taken just before listing them, when the walk is stamped.
+    """
+
+    def __init__(self):
+        self.files: List[Tuple[str, ...]] = []
+        self.by_name: Dict[str, List[Tuple[str, ...]]] = defaultdict(list)
+        self.listings: Dict[Tuple[str, ...], List[Tuple[str, bool]]] = {}
+        self.root_names: FrozenSet[str] = frozenset()
+        self.dirs: List[str] = []
+        self.dir_stamps: List[Tuple[str, int, int]] = []
+
+
+def _walk(path: Path, stamp: bool = False) -> _Tree:
+    """Walk the tree once with os.scandir, skipping IGNORE_DIRS.
+
+    Directories are visited depth-first in listing order, as rglob did;
+    symlinked directories are listed but not entered.
+    """
+    tree = _Tree()
+    stack = [()]
+    while stack:
+        rel = stack.pop()
+        dir_path = os.path.join(path, *rel)
+        tree.dirs.append(dir_path)
+        if stamp:
+            tree.dir_stamps.append(_stamp(dir_path))
+        listing = []
+        subdirs = []
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    name = entry.name
+                    try:
+                        is_dir = entry.is_dir()
+                        if is_dir and not entry.is_symlink():
+                            if name not in IGNORE_DIRS:
+                                subdirs.append((*rel, name))
+                        elif not is_dir:
+                            parts = (*rel, name)
+                            tree.files.append(parts)
+                            tree.by_name[name].append(parts)
+                    except OSError:
+                        continue
+                    listing.append((name, is_dir))
+        except OSError:
+            pass
+        if len(rel) <= STRUCTURE_DEPTH:
+            tree.listings[rel] = listing
+        if not rel:
+            tree.root_names = frozenset(name for name, _ in listing)
+        stack.extend(reversed(subdirs))
+    return tree
+
+
+def _stamp(name: str) -> Tuple[str, int, int]:
+    """(name, mtime_ns, size) of a file or directory; -1s if it's missing."""
+    try:
+        st = os.stat(name)
+        return name, st.st_mtime_ns, st.st_size
+    except OSError:
+        return name, -1, -1
+
+
+def _fingerprint(stamps: Iterable[Tuple[str, int, int]]) -> str:
+    """Hash of what the scan result depends on.
+
+    Adding, removing or renaming anything changes its directory's mtime, and
+    the directory list itself only changes that way, so stat() stamps of the
+    walked directories plus the files whose contents are read are enough.
+    """
+    h = hashlib.blake2b(__version__.encode(), digest_size=16)
+    for name, mtime_ns, size in stamps:
+        h.update(f'{name}\0{mtime_ns}\0{size}\n'.encode())
+    return h.hexdigest()
+
+
+def _load_scan_cache(cache_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(cache_path, 'rb') as f:
+            entry = json.load(f)
+        return entry if isinstance(entry, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def _save_scan_cache(cache_path: Path, entry: Dict[str, Any]):
+    tmp = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(entry))
+        os.replace(tmp, cache_path)
+        # Writing bumps the mtime, so the oldest files are the projects
+        # scanned least recently
+        with os.scandir(cache_path.parent) as it:
+            files = [(e.stat().st_mtime_ns, e.path) for e in it if e.name.endswith('.json')]
+        for _, stale in sorted(files)[:-SCAN_CACHE_SIZE]:
+            os.unlink(stale)
+    except OSError:
+        pass  # Only a cache
+
+
+def scan_project(path: Path, use_cache: bool = False) -> Dict[str, Any]:
     """Scan project directory and extract context.
 
     Returns dict with:
@@ -18,7 +175,41 @@ def scan_project(path: Path) -> Dict[str, Any]:
         - structure: directory tree (key folders)
         - key_files: important files with purposes
         - conventions: detected naming/style conventions
+
+    With use_cache, an unchanged tree's result comes from scan_cache_path()
+    after a stat() per directory instead of a full scan. A tree modified
+    within RACY_NS of the scan isn't cached.
     """
+    if not use_cache:
+        return _scan(path)
+
+    cache_path = scan_cache_path(path)
+    key = str(path)
+    content_paths = [str(path / f) for f in sorted(CONTENT_FILES)]
+    entry = _load_scan_cache(cache_path)
+    if (entry is not None and entry.get('root') == key and isinstance(entry.get('dirs'), list)
+            and entry.get('fingerprint') == _fingerprint(
+                _stamp(name) for name in [*entry['dirs'], *content_paths])):
+        return entry['context']
+
+    # Stamp everything before reading it, so a change made during the
+    # scan invalidates the entry
+    scan_start = time.time_ns()
+    content_stamps = [_stamp(name) for name in content_paths]
+    tree = _walk(path, stamp=True)
+    context = _scan(path, tree)
+    stamps = [*tree.dir_stamps, *content_stamps]
+    if max(mtime_ns for _, mtime_ns, _ in stamps) < scan_start - RACY_NS:
+        _save_scan_cache(cache_path, {'root': key, 'fingerprint': _fingerprint(stamps),
+                                      'dirs': tree.dirs, 'context': context})
+    else:
+        cache_path.unlink(missing_ok=True)
+    return context
+
+
+def _scan(path: Path, tree: Optional[_Tree] = None) -> Dict[str, Any]:
+    if tree is None:
+        tree = _walk(path)
     context = {
         'project_name': path.name,
         'project_type': 'unknown',
@@ -32,30 +223,30 @@ def scan_project(path: Path) -> Dict[str, Any]:
     }
 
     # Detect project type and languages
-    _detect_project_type(path, context)
+    _detect_project_type(tree, context)
 
     # Find entry points
-    _find_entry_points(path, context)
+    _find_entry_points(tree, context)
 
     # Find test patterns
-    _find_test_patterns(path, context)
+    _find_test_patterns(tree, context)
 
     # Extract build commands
-    _extract_build_commands(path, context)
+    _extract_build_commands(path, tree, context)
 
     # Build directory structure
-    _build_structure(path, context)
+    _build_structure(tree, context)
 
     # Find key files
-    _find_key_files(path, context)
+    _find_key_files(tree, context)
 
     # Detect conventions
-    _detect_conventions(path, context)
+    _detect_conventions(tree, context)
 
     return context
 
 
-def _detect_project_type(path: Path, context: Dict):
+def _detect_project_type(tree: _Tree, context: Dict):
     """Detect project type from config files."""
     type_indicators = {
         'pyproject.toml': ('python', 'Python'),
@@ -69,21 +260,28 @@ def _detect_project_type(path: Path, context: Dict):
     }
 
     for file, (ptype, lang) in type_indicators.items():
-        if (path / file).exists():
+        if file in tree.root_names:
             context['project_type'] = ptype
             if lang not in context['languages']:
                 context['languages'].append(lang)
 
     # Check for TypeScript
-    if (path / 'tsconfig.json').exists():
+    if 'tsconfig.json' in tree.root_names:
         if 'TypeScript' not in context['languages']:
             context['languages'].append('TypeScript')
 
 
-def _find_entry_points(path: Path, context: Dict):
-    """Find main entry point files."""
-    ignore_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', '.tox', 'dist', 'build', 'site-packages'}
+def _matches(parts: Tuple[str, ...], pattern: str) -> bool:
+    """Whether a relative path matches an rglob pattern like 'tests/*.py'."""
+    pattern_parts = pattern.split('/')
+    if len(parts) < len(pattern_parts):
+        return False
+    return all(fnmatchcase(part, pat)
+               for part, pat in zip(parts[-len(pattern_parts):], pattern_parts))
 
+
+def _find_entry_points(tree: _Tree, context: Dict):
+    """Find main entry point files."""
     entry_patterns = {
         'python': ['main.py', 'app.py', 'cli.py', '__main__.py', 'run.py'],
         'node': ['index.js', 'index.ts', 'main.js', 'main.ts', 'app.js', 'app.ts', 'server.js', 'server.ts'],
@@ -94,17 +292,26 @@ def _find_entry_points(path: Path, context: Dict):
     patterns = entry_patterns.get(context['project_type'], [])
 
     for pattern in patterns:
-        candidates = list(path.rglob(pattern))
-        for candidate in candidates[:3]:  # Limit to 3
-            # Skip ignored directories
-            if any(ignored in candidate.parts for ignored in ignore_dirs):
-                continue
-            rel_path = candidate.relative_to(path)
-            if str(rel_path) not in context['entry_points']:
-                context['entry_points'].append(str(rel_path))
+        name = pattern.rsplit('/', 1)[-1]
+        candidates = (parts for parts in tree.by_name.get(name, ()) if _matches(parts, pattern))
+        for candidate in islice(candidates, 3):  # Limit to 3
+            rel_path = os.path.join(*candidate)
+            if rel_path not in context['entry_points']:
+                context['entry_points'].append(rel_path)
 
 
-def _find_test_patterns(path: Path, context: Dict):
+@lru_cache(maxsize=None)
+def _name_filter(patterns: Tuple[str, ...]) -> Callable[[str], Optional[Match]]:
+    """One compiled regex for the file-name part of every pattern.
+
+    A file name it rejects matches none of the patterns, so most files cost
+    a single match; the few it accepts are checked pattern by pattern.
+    """
+    return re.compile('|'.join(f'(?:{fnmatch.translate(p.rsplit("/", 1)[-1])})'
+                               for p in patterns)).match
+
+
+def _find_test_patterns(tree: _Tree, context: Dict):
     """Detect test file patterns."""
     test_patterns = {
         'python': ['test_*.py', '*_test.py', 'tests/*.py'],
@@ -114,18 +321,28 @@ def _find_test_patterns(path: Path, context: Dict):
     }
 
     patterns = test_patterns.get(context['project_type'], [])
+    if not patterns:
+        return
+
+    name_filter = _name_filter(tuple(patterns))
+    found = set()
+    for parts in tree.files:
+        if name_filter(parts[-1]):
+            found.update(p for p in patterns if p not in found and _matches(parts, p))
+            # One match per pattern is all it takes
+            if len(found) == len(patterns):
+                break
 
     for pattern in patterns:
-        if list(path.rglob(pattern)):
-            if pattern not in context['test_patterns']:
-                context['test_patterns'].append(pattern)
+        if pattern in found and pattern not in context['test_patterns']:
+            context['test_patterns'].append(pattern)
 
 
-def _extract_build_commands(path: Path, context: Dict):
+def _extract_build_commands(path: Path, tree: _Tree, context: Dict):
     """Extract build/test commands from config files."""
     # Python: pyproject.toml
     pyproject = path / 'pyproject.toml'
-    if pyproject.exists():
+    if 'pyproject.toml' in tree.root_names:
         try:
             with open(pyproject, 'rb') as f:
                 data = tomllib.load(f)
@@ -143,7 +360,7 @@ def _extract_build_commands(path: Path, context: Dict):
 
     # Node: package.json
     package_json = path / 'package.json'
-    if package_json.exists():
+    if 'package.json' in tree.root_names:
         try:
             data = json.loads(package_json.read_text())
             scripts = data.get('scripts', {})
@@ -154,45 +371,49 @@ def _extract_build_commands(path: Path, context: Dict):
 
     # Makefile
     makefile = path / 'Makefile'
-    if makefile.exists():
+    if 'Makefile' in tree.root_names:
         try:
-            content = makefile.read_text()
-            for line in content.split('\n'):
-                if line and not line.startswith('\t') and ':' in line:
-                    target = line.split(':')[0].strip()
+            # Streamed: recipe lines and comments are skipped on their first
+            # character, and reading stops once enough targets are found
+            targets = 0
+            with open(makefile, encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    if line[:1] in ('\t', '#', '\n') or ':' not in line:
+                        continue
+                    target = line.split(':', 1)[0].strip()
                     if target and not target.startswith('.'):
                         context['build_commands'].append(f"make {target}")
+                        targets += 1
+                        if targets >= MAX_MAKE_TARGETS:
+                            break
         except Exception:
             pass
 
 
-def _build_structure(path: Path, context: Dict, max_depth: int = 2):
+def _build_structure(tree: _Tree, context: Dict, max_lines: int = 50):
     """Build directory structure tree."""
-    ignore = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', '.tox', 'dist', 'build', '.pytest_cache'}
-
-    def _tree(p: Path, depth: int = 0) -> List[str]:
-        if depth > max_depth:
-            return []
-        lines = []
-        try:
-            items = sorted(p.iterdir(), key=lambda x: (x.is_file(), x.name))
-            for item in items:
-                if item.name in ignore or item.name.startswith('.'):
-                    continue
-                indent = '  ' * depth
-                if item.is_dir():
-                    lines.append(f"{indent}{item.name}/")
-                    lines.extend(_tree(item, depth + 1))
-                else:
-                    lines.append(f"{indent}{item.name}")
-        except PermissionError:
-            pass
-        return lines
-
-    context['structure'] = _tree(path)[:50]  # Limit lines
-
-
-def _find_key_files(path: Path, context: Dict):
+    lines = []
+
+    def _tree(rel: Tuple[str, ...]):
+        # Drop ignored and hidden entries before sorting what's left
+        items = [(not is_dir, name) for name, is_dir in tree.listings.get(rel, ())
+                 if name not in IGNORE_DIRS and not name.startswith('.')]
+        items.sort()
+        indent = '  ' * len(rel)
+        for is_file, name in items:
+            if len(lines) >= max_lines:
+                return
+            if is_file:
+                lines.append(f"{indent}{name}")
+            else:
+                lines.append(f"{indent}{name}/")
+                _tree((*rel, name))
+
+    _tree(())
+    context['structure'] = lines
+
+
+def _find_key_files(tree: _Tree, context: Dict):
     """Find important files and their purposes."""
     key_file_patterns = {
         'README.md': 'Project documentation',
@@ -206,14 +427,14 @@ def _find_key_files(path: Path, context: Dict):
     }
 
     for pattern, purpose in key_file_patterns.items():
-        if (path / pattern).exists():
+        if pattern in tree.root_names:
             context['key_files'].append({
                 'path': pattern,
                 'purpose': purpose,
             })
 
 
-def _detect_conventions(path: Path, context: Dict):
+def _detect_conventions(tree: _Tree, context: Dict):
     """Detect naming and style conventions."""
     conventions = []
 
@@ -227,15 +448,16 @@ def _detect_conventions(path: Path, context: Dict):
     }
 
     for file, linter in linter_configs.items():
-        if (path / file).exists():
+        if file in tree.root_names:
             conventions.append(f"{linter} configured")
 
     # Detect naming patterns in Python files
     if context['project_type'] == 'python':
-        py_files = list(path.rglob('*.py'))[:20]
+        py_files = list(islice(
+            (parts[-1][:-3] for parts in tree.files if parts[-1].endswith('.py')), 20))
         snake_case = 0
-        for py_file in py_files:
-            if '_' in py_file.stem and py_file.stem.islower():
+        for stem in py_files:
+            if '_' in stem and stem.islower():
                 snake_case += 1
         if snake_case > len(py_files) * 0.5:
             conventions.append('snake_case file naming')
@@ -0,0 +1,98 @@
+"""History socket - Serve recent history from a running watcher to the hook."""
+
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Optional
+
+# Relative to the project root; the history hook looks for it there
+SOCKET_PATH = '.claude/cck.sock'
+
+
+class SocketInUse(Exception):
+    """Another watcher is already serving at the socket path."""
+
+
+class HistoryServer:
+    """Unix socket that hands the current history text to every client.
+
+    The watcher keeps the text up to date after each batch of changes, so a
+    client just connects and reads until EOF: no sqlite3 import, no DB open.
+    """
+
+    def __init__(self, sock_path: Path):
+        self._sock_path = str(sock_path)
+        self._payload = b''
+        self._stop = threading.Event()
+
+        # A socket file left behind by a watcher that didn't exit cleanly
+        # would make bind() fail; one a live watcher answers on stays its own
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self._sock_path)
+        except FileNotFoundError:
+            pass
+        except ConnectionRefusedError:
+            os.unlink(self._sock_path)
+        else:
+            raise SocketInUse(self._sock_path)
+        finally:
+            probe.close()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.bind(self._sock_path)
+            self._sock.listen()
+            self._sock_ino = os.stat(self._sock_path).st_ino
+        except OSError:
+            self._sock.close()
+            raise
+        # accept() wakes up regularly to notice close()
+        self._sock.settimeout(0.5)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def set_text(self, text: str):
+        self._payload = text.encode('utf-8')
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            with conn:
+                try:
+                    conn.sendall(self._payload)
+                except OSError:
+                    pass
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self._sock.close()
+        # Leave a socket some other watcher has bound since alone
+        try:
+            if os.stat(self._sock_path).st_ino == self._sock_ino:
+                os.unlink(self._sock_path)
+        except FileNotFoundError:
+            pass
+
+
+def start_history_server(project_root: Path) -> Optional[HistoryServer]:
+    """Start serving at SOCKET_PATH; None where Unix sockets are unavailable.
+
+    Binding also fails for paths longer than the platform's socket path
+    limit (about 100 bytes); the hook then reads the DB directly. Raises
+    SocketInUse if another watcher already serves the project.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    sock_path = project_root / SOCKET_PATH
+    try:
+        sock_path.parent.mkdir(parents=True, exist_ok=True)
+        return HistoryServer(sock_path)
+    except OSError:
+        return None
@@ -0,0 +1,298 @@
+"""File watching - Detect changes in the project tree."""
+
+import fnmatch
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Container, Dict, Iterable, Iterator, List, Match, Optional, Set, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog is optional; watch falls back to polling
+    FileSystemEventHandler = object
+    Observer = None
+
+# Directory path -> (mtime_ns, file paths, subdirectory paths)
+DirCache = Dict[str, Tuple[int, List[str], List[str]]]
+
+_GLOB_CHARS = '*?['
+
+
+def _compile_globs(globs: List[str]) -> Optional[Callable[[str], Optional[Match]]]:
+    """Join fnmatch globs into one compiled regex; returns its match method."""
+    if not globs:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(g)})' for g in globs)).match
+
+
+class ExcludePatterns:
+    """Exclude patterns compiled once for repeated matching.
+
+    A plain pattern without '/' matches a file or directory by name; one
+    with '/' (e.g. '.claude/cck_history.sqlite') matches the trailing path
+    components of a relative path. A glob without '/'
+    (e.g. '*.log') matches names; one with '/' matches whole relative
+    paths. All globs of each kind are combined into a single regex.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        names, name_globs, path_globs = set(), [], []
+        for pattern in patterns:
+            if not any(c in pattern for c in _GLOB_CHARS):
+                names.add(pattern)
+            elif '/' in pattern:
+                path_globs.append(pattern)
+            else:
+                name_globs.append(pattern)
+        self._names = frozenset(names)
+        paths = [name.replace('/', os.sep) for name in names if '/' in name]
+        self._paths = frozenset(paths)
+        self._suffixes = tuple(os.sep + p for p in paths)
+        self._name_glob = _compile_globs(name_globs)
+        self._path_glob = _compile_globs(path_globs)
+
+    def __contains__(self, name: str) -> bool:
+        """Check a single file or directory name."""
+        return name in self._names or (self._name_glob is not None
+                                       and self._name_glob(name) is not None)
+
+    def matches_path(self, rel_path: str) -> bool:
+        """Check path suffixes and path globs, but not the individual names."""
+        if rel_path in self._paths or rel_path.endswith(self._suffixes):
+            return True
+        return self._path_glob is not None and self._path_glob(
+            rel_path.replace(os.sep, '/')) is not None
+
+    def excludes(self, rel_path: str) -> bool:
+        """Check a relative path, including every name along it."""
+        return self.matches_path(rel_path) or any(part in self for part in rel_path.split(os.sep))
+
+
+def _scan_dir(path: str, ignore: Container[str],
+              dir_cache: Optional[DirCache]) -> Tuple[List[Tuple[str, int]], List[str]]:
+    """Return ([(file path, mtime_ns)], subdirectory paths) directly under path.
+
+    Files are stat'ed together, in directory order, right after the listing
+    so the directory's inodes are still hot. With a dir_cache, the listing
+    is reused while the directory's own mtime is unchanged; adding,
+    removing or renaming an entry bumps that mtime.
+    """
+    mtime = None
+    if dir_cache is not None:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return [], []
+        cached = dir_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            files = []
+            for file_path in cached[1]:
+                try:
+                    files.append((file_path, os.stat(file_path, follow_symlinks=False).st_mtime_ns))
+                except OSError:
+                    continue
+            return files, cached[2]
+
+    files, dirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.name in ignore or entry.is_symlink():
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    try:
+                        files.append((entry.path, entry.stat(follow_symlinks=False).st_mtime_ns))
+                    except OSError:
+                        continue
+    except OSError:
+        return [], []
+
+    if dir_cache is not None:
+        dir_cache[path] = (mtime, [file_path for file_path, _ in files], dirs)
+    return files, dirs
+
+
+def _walk(root: str, ignore: Container[str], dir_cache: Optional[DirCache],
+          visited: DirCache) -> Iterator[Tuple[str, int]]:
+    """Yield (path, mtime_ns) under root, recording listings used in visited."""
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        files, dirs = _scan_dir(path, ignore, dir_cache)
+        if dir_cache is not None and path in dir_cache:
+            visited[path] = dir_cache[path]
+        yield from files
+        stack.extend(reversed(dirs))
+
+
+def get_file_states(root: Path, exclude: Iterable[str],
+                    dir_cache: Optional[DirCache] = None,
+                    workers: int = 1) -> Dict[str, int]:
+    """Get dict of relative file paths to mtimes (in nanoseconds).
+
+    exclude takes patterns as described in ExcludePatterns; pass an
+    ExcludePatterns to avoid recompiling them on every call. File contents
+    can change without touching the parent directory, so every file is
+    still stat'ed even when its directory listing comes from dir_cache.
+
+    With workers > 1, top-level subdirectories are walked on a thread
+    pool; the walk is dominated by stat/scandir calls, which release the GIL.
+    """
+    if not isinstance(exclude, ExcludePatterns):
+        exclude = ExcludePatterns(exclude)
+    root_str = str(root)
+    prefix_len = len(os.path.join(root_str, ''))
+
+    visited = {}
+    files, dirs = _scan_dir(root_str, exclude, dir_cache)
+    if dir_cache is not None and root_str in dir_cache:
+        visited[root_str] = dir_cache[root_str]
+    subtrees = [files]
+    if workers > 1 and len(dirs) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(dirs))) as pool:
+            subtrees.extend(pool.map(
+                lambda d: list(_walk(d, exclude, dir_cache, visited)), dirs))
+    else:
+        subtrees.extend(_walk(d, exclude, dir_cache, visited) for d in dirs)
+
+    states = {}
+    for subtree in subtrees:
+        for file_path, mtime_ns in subtree:
+            rel_path = file_path[prefix_len:]
+            # Excluded names were pruned during the walk
+            if not exclude.matches_path(rel_path):
+                states[rel_path] = mtime_ns
+
+    if dir_cache is not None:
+        dir_cache.clear()
+        dir_cache.update(visited)
+    return states
+
+
+def diff_states(old: Dict[str, int], new: Dict[str, int]) -> List[Tuple[str, str]]:
+    """Return (event_type, rel_path) changes between two get_file_states results."""
+    old_paths, new_paths = old.keys(), new.keys()
+    changes = [('created', path) for path in new_paths - old_paths]
+    changes.extend(('modified', path) for path in new_paths & old_paths
+                   if old[path] != new[path])
+    changes.extend(('deleted', path) for path in old_paths - new_paths)
+    return changes
+
+
+def gitignore_names(root: Path) -> Set[str]:
+    """Return the names and name globs ignored by root's .gitignore.
+
+    Only unanchored patterns without '/', such as 'dist/' or '*.log', are
+    used: they match a file or directory by name at any depth, which is
+    exactly how exclude patterns prune the walk. A later '!name' drops the
+    name again. Negations can re-include files a glob matches, so globs
+    are only used when the file has none.
+    """
+    try:
+        with open(os.path.join(str(root), '.gitignore'), encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return set()
+
+    names, globs = set(), set()
+    negated = False
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] == '#':
+            continue
+        if line[0] == '!':
+            negated = True
+            names.discard(line[1:].rstrip('/'))
+            continue
+        name = line.rstrip('/')
+        if not name or '/' in name or '\\' in name:
+            continue
+        if any(c in name for c in _GLOB_CHARS):
+            globs.add(name)
+        else:
+            names.add(name)
+    return names if negated else names | globs
+
+
+class ChangeCollector(FileSystemEventHandler):
+    """Collect file events from a watchdog observer.
+
+    Events are coalesced per path and handed out in batches by wait(),
+    which debounces bursts such as a git checkout into a single batch.
+    known holds the relative paths existing when watching starts, so a
+    file renamed over one of them is reported as modified.
+    """
+
+    def __init__(self, root: Path, exclude: Iterable[str], known: Iterable[str] = ()):
+        super().__init__()
+        self._prefix_len = len(os.path.join(str(root), ''))
+        self._exclude = exclude if isinstance(exclude, ExcludePatterns) else ExcludePatterns(exclude)
+        self._known = set(known)
+        self._changes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        if event.event_type == 'moved':
+            self._record('deleted', event.src_path)
+            self._record('created', event.dest_path)
+        elif event.event_type in ('created', 'modified', 'deleted'):
+            self._record(event.event_type, event.src_path)
+
+    def _record(self, event_type: str, path: str):
+        rel_path = path[self._prefix_len:]
+        if self._exclude.excludes(rel_path):
+            return
+        # Only the observer thread touches _known
+        existed = rel_path in self._known
+        if event_type == 'deleted':
+            self._known.discard(rel_path)
+        else:
+            self._known.add(rel_path)
+        with self._lock:
+            previous = self._changes.get(rel_path)
+            if previous == 'created':
+                # A file created and then written is still reported as created,
+                # and one created and deleted again (an editor's temp file) never existed
+                if event_type == 'deleted':
+                    del self._changes[rel_path]
+                return
+            if event_type == 'created' and (previous is not None or existed):
+                # Deleted and recreated, or renamed over, as in an editor's
+                # save, is a modification
+                event_type = 'modified'
+            self._changes[rel_path] = event_type
+        self._pending.set()
+
+    def wake(self):
+        """Make a pending wait() return (after the quiet period) even without events."""
+        self._pending.set()
+
+    def wait(self, timeout: float, quiet: float = 0.5,
+             max_wait: Optional[float] = None) -> List[Tuple[str, str]]:
+        """Wait up to timeout for changes, then until quiet for `quiet` seconds.
+
+        With max_wait, events that keep arriving (a log rewritten faster than
+        `quiet`) don't hold the batch back longer than max_wait seconds.
+        Returns a list of (event_type, rel_path), empty on timeout.
+        """
+        if not self._pending.wait(timeout):
+            return []
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while True:
+            self._pending.clear()
+            wait_for = quiet if deadline is None else min(quiet, deadline - time.monotonic())
+            if wait_for <= 0 or not self._pending.wait(wait_for):
+                break
+        with self._lock:
+            changes = [(event_type, rel_path) for rel_path, event_type in self._changes.items()]
+            self._changes.clear()
+        return changes
@@ -0,0 +1,225 @@
+"""Tests for CLI helpers."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from cck.cli import (
+    _WatchSync, _hook_script, _read_snippet, _write_atomic, main, merge_with_existing,
+)
+from cck.generator import AUTO_START, AUTO_END
+
+NEW = f"{AUTO_START}\nnew\n{AUTO_END}"
+
+
+def test_merge_empty_existing():
+    """Use generated content as-is on first run."""
+    assert merge_with_existing("", NEW) == NEW
+
+
+def test_merge_without_markers():
+    """Append generated content to a legacy file."""
+    merged = merge_with_existing("# Mine\n\n", NEW)
+
+    assert merged == f"# Mine\n\n---\n\n{NEW}"
+
+
+def test_merge_preserves_user_content():
+    """Replace only the auto section, keep content around it."""
+    existing = f"# Header\n\n{AUTO_START}\nold\n{AUTO_END}\n\n## Custom\n"
+    merged = merge_with_existing(existing, NEW)
+
+    assert merged == f"# Header\n\n{NEW}\n\n## Custom\n"
+
+
+def test_merge_ignores_end_marker_before_start():
+    """Only an AUTO_END after AUTO_START closes the auto section."""
+    existing = f"{AUTO_END}\n{AUTO_START}\nold\n{AUTO_END}"
+    merged = merge_with_existing(existing, NEW)
+
+    assert merged == f"{AUTO_END}\n\n{NEW}"
+
+
+def test_merge_whitespace_existing():
+    """Treat a whitespace-only file like a missing one."""
+    assert merge_with_existing("\n  \n", NEW) == NEW
+
+
+def test_merge_only_user_after():
+    """Keep custom sections that follow the auto section."""
+    existing = f"{AUTO_START}\nold\n{AUTO_END}\n## Custom"
+    assert merge_with_existing(existing, NEW) == f"{NEW}\n\n## Custom"
+    assert merge_with_existing(f"{AUTO_START}\nold\n{AUTO_END}", NEW) == NEW
+
+
+def test_hook_scripts_packaged():
+    """Ship every hook script as package data, marked as CCK-generated."""
+    for name in ("auto", "reminder", "history", "loader"):
+        script = _hook_script(name).decode()
+        assert script.startswith("#!/usr/bin/env python3")
+        assert "CCK" in script
+        compile(script, name, "exec")
+
+
+def test_sync_skips_identical_write(monkeypatch):
+    """Leave an up-to-date CLAUDE.md (and its mtime) untouched."""
+    # The real header carries a per-minute timestamp
+    monkeypatch.setattr("cck.cli.generate_claude_md", lambda context: NEW)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        (Path(tmpdir) / "main.py").write_text("")
+        output = Path(tmpdir) / "CLAUDE.md"
+        runner = CliRunner()
+
+        assert runner.invoke(main, ["sync", tmpdir]).exit_code == 0
+        os.utime(output, ns=(0, 0))
+        result = runner.invoke(main, ["sync", tmpdir])
+
+        assert result.exit_code == 0
+        assert "No changes" in result.output
+        assert output.stat().st_mtime_ns == 0
+
+
+def test_hook_install_precompiles_module(monkeypatch):
+    """Install a loader that runs the precompiled hook module."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.chdir(tmpdir)
+        runner = CliRunner()
+        hooks_dir = Path(tmpdir) / ".claude" / "hooks"
+
+        assert runner.invoke(main, ["hook", "install"]).exit_code == 0
+        assert list((hooks_dir / "__pycache__").glob("_cck_hook.*.pyc"))
+
+        result = subprocess.run([sys.executable, str(hooks_dir / "user-prompt-submit.py")],
+                                capture_output=True, text=True)
+        assert result.stdout.startswith("[CCK]")
+
+        assert runner.invoke(main, ["hook", "remove"]).exit_code == 0
+        assert not list(hooks_dir.rglob("*_cck_hook*"))
+
+
+def test_read_snippet():
+    """Read the start of text files and skip binary ones."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        text = Path(tmpdir) / "a.py"
+        text.write_bytes("caf\u00e9 = 1\n".encode("utf-8") * 50)
+        binary = Path(tmpdir) / "a.bin"
+        binary.write_bytes(b"\x89PNG\0\0")
+
+        assert _read_snippet(text, 9) == "caf\u00e9 = 1"
+        assert _read_snippet(binary) is None
+        assert _read_snippet(Path(tmpdir) / "missing") is None
+
+
+def test_write_atomic_follows_symlink():
+    """Update a symlinked file's target in place, keeping the link and its mode."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        target = Path(tmpdir) / "AGENTS.md"
+        target.write_text("old")
+        target.chmod(0o640)
+        link = Path(tmpdir) / "CLAUDE.md"
+        link.symlink_to("AGENTS.md")
+
+        _write_atomic(link, b"new")
+
+        assert link.is_symlink()
+        assert target.read_text() == "new"
+        assert target.stat().st_mode & 0o777 == 0o640
+        assert sorted(os.listdir(tmpdir)) == ["AGENTS.md", "CLAUDE.md"]
+
+
+def test_hook_status_flags_outdated_hook(monkeypatch):
+    """Point a hook written before the loader at reinstalling."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.chdir(tmpdir)
+        hooks_dir = Path(tmpdir) / ".claude" / "hooks"
+        hooks_dir.mkdir(parents=True)
+        (hooks_dir / "user-prompt-submit.py").write_text(
+            "# CCK hook\nts = row['timestamp'][11:19]\n")
+        runner = CliRunner()
+
+        result = runner.invoke(main, ["hook", "status"])
+        assert "earlier CCK version" in result.output
+
+        (hooks_dir / "user-prompt-submit.py").unlink()
+        assert runner.invoke(main, ["hook", "install"]).exit_code == 0
+        assert "earlier CCK version" not in runner.invoke(main, ["hook", "status"]).output
+
+
+def _counting_scans(monkeypatch, block=None):
+    """Count scan_project calls; the first waits for block when given."""
+    from cck import scanner
+
+    scans = []
+    real_scan = scanner.scan_project
+
+    def scan(path, use_cache=False):
+        scans.append(path)
+        if block is not None and len(scans) == 1:
+            block.wait(5)
+        return real_scan(path)
+
+    monkeypatch.setattr(scanner, "scan_project", scan)
+    return scans
+
+
+def test_watch_sync_skips_rescan_for_modified_files(monkeypatch):
+    """Rescan for created files but not for edits to files the scan doesn't read."""
+    monkeypatch.setattr("cck.cli.generate_claude_md", lambda context: NEW)
+    scans = _counting_scans(monkeypatch)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        (path / "main.py").write_text("")
+        syncer = _WatchSync(path, path / "CLAUDE.md")
+        syncer.sync()
+        assert len(scans) == 1
+
+        syncer.handle_changes([("modified", "main.py")])
+        syncer.close()
+        assert len(scans) == 1
+
+        syncer = _WatchSync(path, path / "CLAUDE.md")
+        syncer.sync()
+        syncer.handle_changes([("created", "cli.py"), ("modified", "main.py")])
+        syncer.close()
+        assert len(scans) == 3
+
+
+def test_watch_sync_preserves_user_edit(monkeypatch):
+    """Keep content the user added to CLAUDE.md between two syncs."""
+    contents = iter([f"{AUTO_START}\nfirst\n{AUTO_END}", f"{AUTO_START}\nsecond\n{AUTO_END}"])
+    monkeypatch.setattr("cck.cli.generate_claude_md", lambda context: next(contents))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        output = path / "CLAUDE.md"
+        syncer = _WatchSync(path, output)
+        syncer.sync()
+
+        output.write_text("# Mine\n\n" + output.read_text())
+        (path / "main.py").write_text("")
+        syncer.handle_changes([("modified", "CLAUDE.md"), ("created", "main.py")])
+        syncer.close()
+
+        assert output.read_text() == f"# Mine\n\n{AUTO_START}\nsecond\n{AUTO_END}"
+
+
+def test_watch_sync_resyncs_once_after_running_sync(monkeypatch):
+    """Coalesce changes arriving during a sync into exactly one more sync."""
+    monkeypatch.setattr("cck.cli.generate_claude_md", lambda context: NEW)
+    block = threading.Event()
+    scans = _counting_scans(monkeypatch, block)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        syncer = _WatchSync(path, path / "CLAUDE.md")
+
+        syncer.request_sync()
+        for name in ("a.py", "b.py", "c.py"):
+            syncer.handle_changes([("created", name)])
+        block.set()
+        syncer.close()
+
+        assert len(scans) == 2
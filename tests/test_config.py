@@ -0,0 +1,53 @@
+"""Tests for config loading."""
+
+import os
+import tempfile
+from pathlib import Path
+
+import yaml
+
+from cck.config import (
+    CONFIG_TEMPLATE_CB_STYLE, load_config, render_cb_style_config, watch_exclude_patterns,
+)
+from cck.watcher import ExcludePatterns
+
+
+def test_load_config_cached_until_modified():
+    """Reuse the parsed config until the file changes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        config_path = path / "cck.yaml"
+        config_path.write_text("history:\n  max_entries: 10\n")
+
+        first = load_config(path)
+        assert first["history"]["max_entries"] == 10
+        assert first["history"]["db_path"] == ".claude/cck_history.sqlite"
+        assert load_config(path) is first
+
+        config_path.write_text("history:\n  max_entries: 20\n")
+        os.utime(config_path, ns=(0, config_path.stat().st_mtime_ns + 10**9))
+
+        assert load_config(path)["history"]["max_entries"] == 20
+
+
+def test_render_cb_style_config():
+    """Fill in the CB-style template exactly where setup used to replace."""
+    assert render_cb_style_config(["."], "20") == CONFIG_TEMPLATE_CB_STYLE.replace(
+        "    - .  # Monitor entire project", "    - .")
+
+    config = yaml.safe_load(render_cb_style_config(["src", "lib"], "5"))
+    assert config["watch"]["paths"] == ["src", "lib"]
+    assert config["reminder"]["history_limit"] == 5
+
+
+def test_watch_exclude_patterns_keeps_extensions():
+    """Keep extension-style exclude entries matching files by suffix."""
+    config = {'watch': {'exclude': ['.git', '.log', 'dist', '*.tmp']}}
+
+    patterns = watch_exclude_patterns(config)
+    exclude = ExcludePatterns(patterns)
+
+    assert patterns == ['.git', '.log', '*.log', 'dist', '*.tmp']
+    assert exclude.excludes('app.log')
+    assert exclude.excludes(os.path.join('logs', 'app.log'))
+    assert not exclude.excludes('app.git')
@@ -0,0 +1,200 @@
+"""Tests for history tracking."""
+
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from cck.history import (
+    FileChange, HistoryWriter, Operation, cleanup_old_entries, format_history_detailed,
+    get_combined_history, get_recent_changes, get_recent_operations, init_db, log_file_changes,
+    log_operations,
+)
+
+
+def test_log_file_changes():
+    """Log a batch of file changes in one call."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        conn = init_db(Path(tmpdir) / ".claude" / "history.sqlite")
+
+        log_file_changes(conn, [("created", "a.py", "x = 1"), ("deleted", "b.py", None),
+                                ("modified", "c.py", "y" * 200)])
+
+        changes = get_recent_changes(conn)
+        assert {(c.event_type, c.file_path, c.snippet) for c in changes} == {
+            ("created", "a.py", "x = 1"),
+            ("deleted", "b.py", None),
+            ("modified", "c.py", "y" * 80),
+        }
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        conn.close()
+
+
+def test_log_operations():
+    """Log a batch of operations in one call."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        conn = init_db(Path(tmpdir) / ".claude" / "history.sqlite")
+
+        log_operations(conn, [("Bash", "pytest -q"), ("Edit", "cck/cli.py")])
+
+        ops = get_recent_operations(conn)
+        assert {(o.operation_type, o.summary) for o in ops} == {
+            ("Bash", "pytest -q"),
+            ("Edit", "cck/cli.py"),
+        }
+        conn.close()
+
+
+def test_get_combined_history():
+    """Interleave file changes and operations newest first, up to the limit."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        conn = init_db(Path(tmpdir) / ".claude" / "history.sqlite")
+        log_file_changes(conn, [("created", "a.py", None)])
+        log_operations(conn, [("Bash", "pytest -q")])
+        log_file_changes(conn, [("modified", "a.py", None)])
+
+        history = get_combined_history(conn, limit=2)
+
+        assert [h[1:] for h in history] == [("modified", "a.py", None), ("Bash", "pytest -q")]
+        assert [type(h) for h in history] == [FileChange, Operation]
+        conn.close()
+
+
+def test_cleanup_old_entries():
+    """Keep only the newest max_entries rows of each table."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        conn = init_db(Path(tmpdir) / ".claude" / "history.sqlite")
+        log_file_changes(conn, [("modified", f"{i}.py", None) for i in range(5)])
+        log_operations(conn, [("Bash", "ls")])
+
+        cleanup_old_entries(conn, max_entries=2)
+
+        assert {c.file_path for c in get_recent_changes(conn)} == {"4.py", "3.py"}
+        assert len(get_recent_operations(conn)) == 1
+        cleanup_old_entries(conn, max_entries=2)
+        assert len(get_recent_changes(conn)) == 2
+        conn.close()
+
+
+def test_combined_history_uses_indexes():
+    """Serve the combined history from ordered index scans, without a sort."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        conn = init_db(Path(tmpdir) / ".claude" / "history.sqlite")
+        queries = []
+        conn.set_trace_callback(queries.append)
+        get_combined_history(conn, limit=5)
+        conn.set_trace_callback(None)
+
+        sql = queries[-1].replace("LIMIT 5", "LIMIT ?")
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", (5,))]
+        assert any("idx_file_changes_ts_id" in step for step in plan)
+        assert any("idx_operations_ts_id" in step for step in plan)
+        assert not any("TEMP B-TREE" in step for step in plan)
+        conn.close()
+
+
+def test_history_writer():
+    """Commit queued rows from the writer thread by the time flush returns."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        conn = init_db(Path(tmpdir) / ".claude" / "history.sqlite", check_same_thread=False)
+        writes = []
+        writer = HistoryWriter(conn, on_write=lambda: writes.append(1))
+
+        writer.log_file_changes([("created", "a.py", None), ("modified", "b.py", "x")])
+        writer.log_operations([("Bash", "ls")])
+        writer.flush()
+
+        assert {c.file_path for c in get_recent_changes(conn)} == {"a.py", "b.py"}
+        assert [o.summary for o in get_recent_operations(conn)] == ["ls"]
+        assert writes
+
+        writer.log_file_changes([("deleted", "a.py", None)])
+        writer.close()
+        assert len(get_recent_changes(conn)) == 3
+        conn.close()
+
+
+def test_init_db_migrates_iso_timestamps():
+    """Convert a version 0 DB's ISO timestamps to epoch microseconds."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = Path(tmpdir) / "history.sqlite"
+        old = sqlite3.connect(str(db_path))
+        old.executescript("""
+            CREATE TABLE file_changes (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL, event_type TEXT NOT NULL,
+                file_path TEXT NOT NULL, snippet TEXT);
+            CREATE TABLE operations (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL, operation_type TEXT NOT NULL, summary TEXT NOT NULL);
+            CREATE INDEX idx_file_changes_timestamp ON file_changes(timestamp DESC);
+            INSERT INTO file_changes (timestamp, event_type, file_path)
+                VALUES ('2025-01-02T03:04:05.123456', 'created', 'a.py');
+            INSERT INTO operations (timestamp, operation_type, summary)
+                VALUES ('2025-01-02T03:04:06', 'Bash', 'ls');
+        """)
+        old.close()
+
+        conn = init_db(db_path)
+        history = get_combined_history(conn)
+
+        assert all(isinstance(h.timestamp, int) for h in history)
+        assert format_history_detailed(history).splitlines() == [
+            "[2025-01-02 03:04:06] Bash: ls",
+            "[2025-01-02 03:04:05] File created: a.py",
+        ]
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 1
+        conn.close()
+
+        conn = init_db(db_path)
+        assert conn.execute('SELECT COUNT(*) FROM file_changes').fetchone()[0] == 1
+        conn.close()
+
+
+def test_init_db_migration_is_atomic(monkeypatch):
+    """Roll back an interrupted migration so the next init_db redoes it."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = Path(tmpdir) / "history.sqlite"
+        old = sqlite3.connect(str(db_path))
+        old.executescript("""
+            CREATE TABLE file_changes (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL, event_type TEXT NOT NULL,
+                file_path TEXT NOT NULL, snippet TEXT);
+            CREATE TABLE operations (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL, operation_type TEXT NOT NULL, summary TEXT NOT NULL);
+            INSERT INTO file_changes (timestamp, event_type, file_path)
+                VALUES ('2025-01-02T03:04:05', 'created', 'a.py');
+        """)
+        old.close()
+
+        def interrupted(conn):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr("cck.history._copy_v0_rows", interrupted)
+        try:
+            init_db(db_path)
+        except KeyboardInterrupt:
+            pass
+        monkeypatch.undo()
+
+        conn = init_db(db_path)
+        assert [c.file_path for c in get_recent_changes(conn)] == ["a.py"]
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_master"
+                            " WHERE name LIKE '%_v0'").fetchone()[0] == 0
+        conn.close()
+
+
+def test_cleanup_old_entries_in_chunks(monkeypatch):
+    """Delete a large excess in several commits, then truncate the WAL."""
+    monkeypatch.setattr("cck.history.CLEANUP_CHUNK", 2)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = Path(tmpdir) / "history.sqlite"
+        conn = init_db(db_path)
+        log_file_changes(conn, [("modified", f"{i}.py", None) for i in range(7)])
+        commits = []
+        conn.set_trace_callback(lambda sql: sql == "COMMIT" and commits.append(sql))
+
+        cleanup_old_entries(conn, max_entries=2)
+
+        assert len(get_recent_changes(conn)) == 2
+        assert len(commits) >= 3
+        assert os.path.getsize(f"{db_path}-wal") == 0
+        conn.close()
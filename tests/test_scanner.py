@@ -1,23 +1,36 @@
 """Tests for project scanner."""
 
+import os
 import tempfile
+import time
 from pathlib import Path
 
+import pytest
+
+from cck import scanner
 from cck.scanner import scan_project
 
 
-def test_detect_python_project():
-    """Detect Python project from pyproject.toml."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        path = Path(tmpdir)
-        (path / "pyproject.toml").write_text("[project]\nname = 'test'")
-        (path / "main.py").write_text("print('hello')")
+@pytest.fixture(scope="module")
+def python_context(tmp_path_factory):
+    """Scan of a Python project with a main.py, built and scanned once per module."""
+    path = tmp_path_factory.mktemp("python_project")
+    (path / "pyproject.toml").write_text("[project]\nname = 'test'")
+    (path / "main.py").write_text("print('hello')")
 
-        context = scan_project(path)
+    # Create .venv with a main.py that should be ignored
+    venv = path / ".venv" / "lib" / "python3" / "site-packages" / "pkg"
+    venv.mkdir(parents=True)
+    (venv / "main.py").write_text("# should be ignored")
+
+    return scan_project(path)
 
-        assert context["project_type"] == "python"
-        assert "Python" in context["languages"]
-        assert "main.py" in context["entry_points"]
+
+def test_detect_python_project(python_context):
+    """Detect Python project from pyproject.toml."""
+    assert python_context["project_type"] == "python"
+    assert "Python" in python_context["languages"]
+    assert "main.py" in python_context["entry_points"]
 
 
 def test_detect_node_project():
@@ -63,19 +76,99 @@ def test_build_structure():
         assert any("tests/" in line for line in context["structure"])
 
 
-def test_ignore_venv():
+def test_ignore_venv(python_context):
     """Ignore .venv directory in entry point detection."""
+    # Only project's main.py should be found
+    assert python_context["entry_points"] == ["main.py"]
+
+
+def _backdate(path: Path, seconds: int = 60):
+    """Move the mtimes under path into the past, out of the racy window."""
+    past = time.time() - seconds
+    for item in [path, *path.rglob("*")]:
+        os.utime(item, (past, past))
+
+
+def test_scan_cache(monkeypatch):
+    """Reuse a cached scan until something under the tree is added or removed."""
     with tempfile.TemporaryDirectory() as tmpdir:
         path = Path(tmpdir)
         (path / "pyproject.toml").write_text("[project]\nname = 'test'")
-        (path / "main.py").write_text("print('hello')")
+        (path / "src").mkdir()
+        _backdate(path)
+
+        first = scan_project(path, use_cache=True)
+        assert scanner.scan_cache_path(path).exists()
 
-        # Create .venv with a main.py that should be ignored
-        venv = path / ".venv" / "lib" / "python3" / "site-packages" / "pkg"
-        venv.mkdir(parents=True)
-        (venv / "main.py").write_text("# should be ignored")
+        scans = []
+        real_scan = scanner._scan
+        monkeypatch.setattr(scanner, "_scan",
+                            lambda p, *args: scans.append(p) or real_scan(p, *args))
+        assert scan_project(path, use_cache=True) == first
+        assert scans == []
+
+        (path / "src" / "main.py").write_text("")
+        assert str(Path("src") / "main.py") in scan_project(path, use_cache=True)["entry_points"]
+        assert scans == [path]
+
+
+def test_scan_cache_skips_racy_trees():
+    """Don't cache a scan of a tree modified just before it."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        (path / "main.py").write_text("")
+
+        scan_project(path, use_cache=True)
+        assert not scanner.scan_cache_path(path).exists()
+
+        _backdate(path)
+        scan_project(path, use_cache=True)
+        assert scanner.scan_cache_path(path).exists()
+
+
+def test_scan_cache_one_file_per_project(monkeypatch):
+    """Keep each project's scan in its own file, dropping the least recent."""
+    monkeypatch.setattr(scanner, "SCAN_CACHE_SIZE", 2)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        projects = []
+        for i in range(3):
+            project = Path(tmpdir) / f"p{i}"
+            project.mkdir()
+            _backdate(project)
+            scan_project(project, use_cache=True)
+            os.utime(scanner.scan_cache_path(project), ns=(i, i))
+            projects.append(project)
+
+        assert [scanner.scan_cache_path(p).exists() for p in projects] == [False, True, True]
+
+
+def test_ignored_dirs_skipped_by_every_phase():
+    """Files under ignored directories count for no pattern."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        (path / "package.json").write_text("{}")
+        (path / "src").mkdir()
+        (path / "src" / "index.js").write_text("")
+        for i in range(3):
+            pkg = path / "node_modules" / f"pkg{i}"
+            pkg.mkdir(parents=True)
+            (pkg / "index.js").write_text("")
+            (pkg / "index.test.js").write_text("")
+
+        context = scan_project(path)
+
+        assert context["entry_points"] == [str(Path("src") / "index.js")]
+        assert context["test_patterns"] == []
+
+
+def test_makefile_targets():
+    """List Makefile targets, skipping recipes, comments and special targets."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        (path / "Makefile").write_text(
+            "# build: not a target\n.PHONY: test\n\ntest:\n\tpytest -q\nlint: test\n\truff .\n"
+        )
 
         context = scan_project(path)
 
-        # Only project's main.py should be found
-        assert context["entry_points"] == ["main.py"]
+        assert context["build_commands"] == ["make test", "make lint"]
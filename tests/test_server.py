@@ -0,0 +1,48 @@
+"""Tests for the history socket."""
+
+import socket
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from cck.server import SOCKET_PATH, SocketInUse, start_history_server
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_history_server():
+    """Hand the current text to each client and remove the socket on close."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        server = start_history_server(root)
+        assert server is not None
+        server.set_text("[CCK] test - No recent changes")
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(str(root / SOCKET_PATH))
+            assert client.recv(65536) == b"[CCK] test - No recent changes"
+
+        server.close()
+        assert not (root / SOCKET_PATH).exists()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_history_server_keeps_live_socket():
+    """Leave a live watcher's socket alone and replace a stale one."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        server = start_history_server(root)
+        assert server is not None
+
+        with pytest.raises(SocketInUse):
+            start_history_server(root)
+        assert (root / SOCKET_PATH).exists()
+
+        server.close()
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(root / SOCKET_PATH))
+        stale.close()
+
+        server = start_history_server(root)
+        assert server is not None
+        server.close()
@@ -0,0 +1,214 @@
+"""Tests for file watcher."""
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from cck.watcher import (
+    ChangeCollector, ExcludePatterns, diff_states, get_file_states, gitignore_names,
+)
+
+
+def test_get_file_states():
+    """Collect relative paths of files in the tree."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        (path / "src").mkdir()
+        (path / "src" / "main.py").write_text("")
+        (path / "README.md").write_text("# Test")
+
+        states = get_file_states(path, [])
+
+        assert set(states) == {"README.md", str(Path("src") / "main.py")}
+
+
+def test_get_file_states_exclude():
+    """Skip excluded directories and path suffixes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        (path / "main.py").write_text("")
+        (path / "node_modules" / "pkg").mkdir(parents=True)
+        (path / "node_modules" / "pkg" / "index.js").write_text("")
+        (path / ".claude").mkdir()
+        (path / ".claude" / "cck_history.sqlite").write_text("")
+        (path / ".claude" / "reminder.md").write_text("")
+
+        states = get_file_states(path, ["node_modules", ".claude/cck_history.sqlite"])
+
+        assert set(states) == {"main.py", str(Path(".claude") / "reminder.md")}
+
+
+ROOT = Path("/project")
+
+
+def _event(event_type, src, dest=None):
+    """A watchdog-like file event for paths relative to ROOT."""
+    return SimpleNamespace(event_type=event_type, is_directory=False,
+                           src_path=str(ROOT / src), dest_path=dest and str(ROOT / dest))
+
+
+def test_change_collector_coalesces_events():
+    """Coalesce watchdog events per path and drop excluded ones."""
+    collector = ChangeCollector(ROOT, [".git"])
+
+    collector.on_any_event(_event("created", "a.py"))
+    collector.on_any_event(_event("modified", "a.py"))
+    collector.on_any_event(_event("modified", str(Path(".git") / "index")))
+    collector.on_any_event(_event("moved", "old.py", "new.py"))
+
+    changes = collector.wait(timeout=0, quiet=0)
+
+    assert sorted(changes) == [("created", "a.py"), ("created", "new.py"), ("deleted", "old.py")]
+    assert collector.wait(timeout=0, quiet=0) == []
+
+
+def test_change_collector_editor_save():
+    """Drop temp files created and deleted in a batch; report a recreated file as modified."""
+    collector = ChangeCollector(ROOT, [])
+
+    collector.on_any_event(_event("created", "4913"))
+    collector.on_any_event(_event("deleted", "4913"))
+    collector.on_any_event(_event("deleted", "a.py"))
+    collector.on_any_event(_event("created", ".a.py.tmp"))
+    collector.on_any_event(_event("modified", ".a.py.tmp"))
+    collector.on_any_event(_event("moved", ".a.py.tmp", "a.py"))
+
+    assert collector.wait(timeout=0, quiet=0) == [("modified", "a.py")]
+
+
+def test_change_collector_rename_over_existing():
+    """Report a temp file renamed over an existing file as a modification."""
+    collector = ChangeCollector(ROOT, [], known=["a.py"])
+
+    collector.on_any_event(_event("created", "a.py.tmp"))
+    collector.on_any_event(_event("moved", "a.py.tmp", "a.py"))
+    assert collector.wait(timeout=0, quiet=0) == [("modified", "a.py")]
+
+    # Files created while watching are known from then on
+    collector.on_any_event(_event("created", "b.py"))
+    assert collector.wait(timeout=0, quiet=0) == [("created", "b.py")]
+    collector.on_any_event(_event("moved", "b.py.tmp", "b.py"))
+    assert sorted(collector.wait(timeout=0, quiet=0)) == [
+        ("deleted", "b.py.tmp"), ("modified", "b.py")]
+
+
+def test_change_collector_max_wait():
+    """Hand out a batch after max_wait even while events keep arriving."""
+    collector = ChangeCollector(ROOT, [])
+    stop = threading.Event()
+
+    def churn():
+        while not stop.is_set():
+            collector.on_any_event(_event("modified", "app.log"))
+            time.sleep(0.01)
+
+    thread = threading.Thread(target=churn)
+    thread.start()
+    try:
+        start = time.monotonic()
+        changes = collector.wait(timeout=1, quiet=0.2, max_wait=0.3)
+        elapsed = time.monotonic() - start
+    finally:
+        stop.set()
+        thread.join()
+
+    assert changes == [("modified", "app.log")]
+    assert elapsed < 1
+
+
+def test_get_file_states_dir_cache():
+    """Reuse cached listings but still pick up file edits and new files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        (path / "src").mkdir()
+        (path / "src" / "main.py").write_text("")
+        dir_cache = {}
+
+        first = get_file_states(path, [], dir_cache)
+        assert str(path / "src") in dir_cache
+
+        main_py = path / "src" / "main.py"
+        os.utime(main_py, ns=(0, first[str(Path("src") / "main.py")] + 10**9))
+        (path / "README.md").write_text("# Test")
+        second = get_file_states(path, [], dir_cache)
+
+        assert second[str(Path("src") / "main.py")] != first[str(Path("src") / "main.py")]
+        assert "README.md" in second
+
+
+def test_get_file_states_workers():
+    """Walking subtrees in parallel gives the same result."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        for name in ("a", "b", "c"):
+            (path / name / "sub").mkdir(parents=True)
+            (path / name / "sub" / f"{name}.py").write_text("")
+        (path / "top.py").write_text("")
+        dir_cache = {}
+
+        serial = get_file_states(path, [])
+        parallel = get_file_states(path, [], dir_cache, workers=4)
+
+        assert parallel == serial
+        assert str(path / "a" / "sub") in dir_cache
+
+
+def test_gitignore_names():
+    """Use unanchored gitignored names, dropping globs once there are negations."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        assert gitignore_names(path) == set()
+
+        (path / ".gitignore").write_text("# build output\ndist/\n.env\n*.log\n/local\ndocs/_build\n")
+        assert gitignore_names(path) == {"dist", ".env", "*.log"}
+
+        (path / ".gitignore").write_text("dist/\n*.log\nkeep\n!keep\n")
+        assert gitignore_names(path) == {"dist"}
+
+
+def test_get_file_states_globs():
+    """Match name globs at any depth and path globs against relative paths."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        (path / "logs").mkdir()
+        (path / "logs" / "app.log").write_text("")
+        (path / "debug.log").write_text("")
+        (path / "docs").mkdir()
+        (path / "docs" / "draft.tmp").write_text("")
+        (path / "keep.tmp").write_text("")
+        (path / "main.py").write_text("")
+        exclude = ExcludePatterns(["*.log", "docs/*.tmp"])
+
+        states = get_file_states(path, exclude)
+
+        assert set(states) == {"main.py", "keep.tmp"}
+        assert exclude.excludes(str(Path("logs") / "app.log"))
+        assert not exclude.excludes("main.py")
+
+
+def test_diff_states():
+    """Report created, modified and deleted paths between two scans."""
+    old = {"a.py": 1, "b.py": 1, "c.py": 1}
+    new = {"a.py": 1, "b.py": 2, "d.py": 1}
+
+    assert sorted(diff_states(old, new)) == [
+        ("created", "d.py"), ("deleted", "c.py"), ("modified", "b.py"),
+    ]
+    assert diff_states(new, new) == []
+
+
+def test_exclude_patterns_component_boundary():
+    """Match plain names and path suffixes only at path component boundaries."""
+    exclude = ExcludePatterns(["build", "out", "lib", ".env", ".claude/cck_history.sqlite"])
+
+    assert not exclude.excludes(os.path.join("scripts", "rebuild"))
+    assert not exclude.excludes(os.path.join("src", "layout"))
+    assert not exclude.excludes(os.path.join("src", "zlib"))
+    assert not exclude.excludes(os.path.join("deploy", "prod.env"))
+    assert exclude.excludes(os.path.join("scripts", "build"))
+    assert exclude.excludes(os.path.join(".claude", "cck_history.sqlite"))
+    assert exclude.excludes(os.path.join("sub", ".claude", "cck_history.sqlite"))
+    assert not exclude.excludes(os.path.join("my.claude", "cck_history.sqlite"))